@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from datetime import timedelta
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from celery.schedules import schedule
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # internal
     'accounts',
     'news',
@@ -102,6 +103,14 @@ DATABASES = {
         'PASSWORD': config('PASSWORD'),
         'HOST': config('HOST', 'localhost'),
         'PORT': config('PORT'),
+        # Seconds a connection is reused across requests, 0 closes it after each
+        # request and None keeps it open. Keep 0 under ASGI, where connections
+        # are per thread, and pool through pgbouncer instead.
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', 0, cast=lambda value: None if value in ('', 'None') else int(value)),
+        # Check reused connections before the first query of a request
+        'CONN_HEALTH_CHECKS': config('CONN_HEALTH_CHECKS', False, cast=bool),
+        # Required behind pgbouncer in transaction pooling mode
+        'DISABLE_SERVER_SIDE_CURSORS': config('DISABLE_SERVER_SIDE_CURSORS', False, cast=bool),
     }
 }
 
@@ -169,6 +178,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # JSON_RENDERER: drf, or orjson for faster rendering of the same output
+        'news.renderers.ORJSONRenderer' if config('JSON_RENDERER', 'drf') == 'orjson'
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # SIMPLE_JWT
@@ -189,14 +204,112 @@ CELERY_RESULT_EXPIRES = timedelta(days=1)
 CELERY_TASK_ALWAYS_EAGER = False
 CELERY_WORKER_PREFETCH_MULTIPLIER = 4
 CELERY_TIMEZONE = 'Asia/Tehran'
+# Scraping runs on its own queue, consumed by workers with a bounded concurrency
+CELERY_TASK_ROUTES = {
+    'news.tasks.discover_zoomit': {'queue': 'scrape'},
+    'news.tasks.fetch_article': {'queue': 'scrape'},
+}
 
 
 CELERY_BEAT_SCHEDULE = {
     "sample_task": {
         "task": "news.tasks.scrape_zoomit",
         "schedule": schedule(int(config('CELERY_TASK_ZOOMIT_SCHEDULE_SECOND'))),
+        # A trigger still queued when the next one fires is dropped
+        "options": {"expires": int(config('CELERY_TASK_ZOOMIT_SCHEDULE_SECOND'))},
     },
+    "rebuild_tag_counts": {
+        "task": "news.tasks.rebuild_tag_counts",
+        "schedule": schedule(config('CELERY_TASK_TAG_COUNTS_SCHEDULE_SECOND', 3600, cast=int)),
+    },
+}
+
+
+# CACHE CONFIGS
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': config('CACHE_LOCATION', 'redis://localhost:6379/1'),
+    }
 }
+# Tests run on an in-memory cache, emptied before every test
+TEST_RUNNER = 'core.test_runner.TestRunner'
+# Lifetime of cached GET responses, writes invalidate them earlier
+NEWS_RESPONSE_CACHE_SECONDS = config('NEWS_RESPONSE_CACHE_SECONDS', 300, cast=int)
+
+
+# NEWS API CONFIGS
+NEWS_BULK_MAX_ITEMS = config('NEWS_BULK_MAX_ITEMS', 500, cast=int)
+# Default engine of News.search: substring or fulltext
+NEWS_SEARCH_ENGINE = config('NEWS_SEARCH_ENGINE', 'substring')
+# Case-insensitive substring search on both title and content, served by the
+# pg_trgm indexes of migration 0006, ignored where those indexes are missing
+NEWS_SEARCH_TRIGRAM = config('NEWS_SEARCH_TRIGRAM', False, cast=bool)
+# Default pagination of list endpoints: page or cursor (keyset)
+NEWS_PAGINATION_MODE = config('NEWS_PAGINATION_MODE', 'page')
+# Lifetime of the exact counts of cursor pages
+NEWS_COUNT_CACHE_SECONDS = config('NEWS_COUNT_CACHE_SECONDS', 60, cast=int)
+# Rows fetched per round trip by the streaming export
+NEWS_EXPORT_CHUNK_SIZE = config('NEWS_EXPORT_CHUNK_SIZE', 2000, cast=int)
+# Largest page of the change feed
+NEWS_CHANGES_MAX_LIMIT = config('NEWS_CHANGES_MAX_LIMIT', 1000, cast=int)
+# Age under which changes are held back from the feed, so that transactions
+# committing late with older timestamps are not skipped by clients
+NEWS_CHANGES_SETTLE_SECONDS = config('NEWS_CHANGES_SETTLE_SECONDS', 5, cast=int)
+# Default and largest size of the popular tags list
+NEWS_POPULAR_TAGS = config('NEWS_POPULAR_TAGS', 10, cast=int)
+NEWS_POPULAR_TAGS_MAX = config('NEWS_POPULAR_TAGS_MAX', 100, cast=int)
+# Default and largest number of tag suggestions
+NEWS_TAG_SUGGEST_LIMIT = config('NEWS_TAG_SUGGEST_LIMIT', 10, cast=int)
+NEWS_TAG_SUGGEST_MAX = config('NEWS_TAG_SUGGEST_MAX', 50, cast=int)
+# Tag name to id mappings kept per process, and their lifetime in the shared cache
+NEWS_TAG_LRU_SIZE = config('NEWS_TAG_LRU_SIZE', 4096, cast=int)
+NEWS_TAG_CACHE_SECONDS = config('NEWS_TAG_CACHE_SECONDS', 86400, cast=int)
+
+
+# SCRAPER CONFIGS
+ZOOMIT_SCRAPER_CONCURRENCY = config('ZOOMIT_SCRAPER_CONCURRENCY', 1, cast=int)
+ZOOMIT_SCRAPER_HOST_INTERVAL = config('ZOOMIT_SCRAPER_HOST_INTERVAL', 1.0, cast=float)
+# auto, http or selenium
+ZOOMIT_SCRAPER_BACKEND = config('ZOOMIT_SCRAPER_BACKEND', 'auto')
+ZOOMIT_SCRAPER_HTTP_TIMEOUT = config('ZOOMIT_SCRAPER_HTTP_TIMEOUT', 15, cast=int)
+# Archive pages to walk per run, pagination stops earlier at known items
+ZOOMIT_SCRAPER_MAX_PAGES = config('ZOOMIT_SCRAPER_MAX_PAGES', 1, cast=int)
+# Scraped articles are stored in batches of this size
+ZOOMIT_SCRAPER_BATCH_SIZE = config('ZOOMIT_SCRAPER_BATCH_SIZE', 20, cast=int)
+# Dump of scraped records: jsonl or none
+ZOOMIT_SCRAPER_OUTPUT = config('ZOOMIT_SCRAPER_OUTPUT', 'jsonl')
+ZOOMIT_SCRAPER_OUTPUT_PATH = config('ZOOMIT_SCRAPER_OUTPUT_PATH', 'news_output.jsonl')
+ZOOMIT_SCRAPER_OUTPUT_GZIP = config('ZOOMIT_SCRAPER_OUTPUT_GZIP', False, cast=bool)
+ZOOMIT_SCRAPER_OUTPUT_ROTATE_MB = config('ZOOMIT_SCRAPER_OUTPUT_ROTATE_MB', 0, cast=float)
+# Chrome fetch path: skip images, fonts, media and stylesheets, resolve only the hosts
+# of ZOOMIT_SELENIUM_ALLOWED_HOSTS, and stop waiting once the extracted elements exist
+ZOOMIT_SELENIUM_BLOCK_RESOURCES = config('ZOOMIT_SELENIUM_BLOCK_RESOURCES', True, cast=bool)
+ZOOMIT_SELENIUM_ALLOWED_HOSTS = config('ZOOMIT_SELENIUM_ALLOWED_HOSTS', 'zoomit.ir,*.zoomit.ir', cast=Csv())
+# Warm Chrome sessions kept by each worker process across scrape runs
+ZOOMIT_DRIVER_POOL_SIZE = config('ZOOMIT_DRIVER_POOL_SIZE', ZOOMIT_SCRAPER_CONCURRENCY, cast=int)
+# A session is replaced after this many pages, or once its browser uses more memory (0 for no limit)
+ZOOMIT_DRIVER_MAX_PAGES = config('ZOOMIT_DRIVER_MAX_PAGES', 100, cast=int)
+ZOOMIT_DRIVER_MAX_MEMORY_MB = config('ZOOMIT_DRIVER_MAX_MEMORY_MB', 1024, cast=int)
+# Split scrape_zoomit into a discovery task and one fetch task per article
+# (on the `scrape` queue), chorded into a batched persistence task
+ZOOMIT_SCRAPER_FANOUT = config('ZOOMIT_SCRAPER_FANOUT', False, cast=bool)
+# Retries of a failing article fetch, with a backoff doubling from ZOOMIT_FETCH_RETRY_BACKOFF seconds
+ZOOMIT_FETCH_RETRIES = config('ZOOMIT_FETCH_RETRIES', 3, cast=int)
+ZOOMIT_FETCH_RETRY_BACKOFF = config('ZOOMIT_FETCH_RETRY_BACKOFF', 5, cast=int)
+ZOOMIT_FETCH_RETRY_BACKOFF_MAX = config('ZOOMIT_FETCH_RETRY_BACKOFF_MAX', 300, cast=int)
+# Celery rate limit of article fetches, e.g. 30/m. Celery enforces it per worker node across
+# all its processes, whose own HostThrottles do not see each other; by default the node keeps
+# the per-host budget of ZOOMIT_SCRAPER_HOST_INTERVAL, so run a single `scrape` worker node
+ZOOMIT_FETCH_RATE_LIMIT = config('ZOOMIT_FETCH_RATE_LIMIT', '') or (
+    f"{60 / ZOOMIT_SCRAPER_HOST_INTERVAL:g}/m" if ZOOMIT_SCRAPER_HOST_INTERVAL > 0 else None
+)
+# Lease of the scrape run lock in seconds, renewed every ZOOMIT_SCRAPE_LOCK_HEARTBEAT seconds
+# while the run is alive, so the lock of a dead worker expires on its own
+ZOOMIT_SCRAPE_LOCK_LEASE = config('ZOOMIT_SCRAPE_LOCK_LEASE', 300, cast=int)
+ZOOMIT_SCRAPE_LOCK_HEARTBEAT = config('ZOOMIT_SCRAPE_LOCK_HEARTBEAT', 60, cast=int)
+# Trigger arriving during a run: `skip` drops it, `coalesce` runs once more after the current run
+ZOOMIT_SCRAPE_OVERLAP = config('ZOOMIT_SCRAPE_OVERLAP', 'coalesce')
 
 
 # Flower Configuration
@@ -0,0 +1,22 @@
+"""
+Gunicorn settings of the production server, see serve.sh.
+Every value can be overridden from the environment (or .env), `config` itself
+is a gunicorn setting, hence decouple is imported as `env`.
+"""
+import multiprocessing
+from decouple import config as env
+
+
+bind = env('WEB_BIND', '0.0.0.0:8000')
+# (2 x cores) + 1 is the usual starting point for I/O bound workers
+workers = env('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1, cast=int)
+# Threads per worker, used by the gthread worker class
+threads = env('WEB_THREADS', 4, cast=int)
+timeout = env('WEB_TIMEOUT', 30, cast=int)
+graceful_timeout = env('WEB_GRACEFUL_TIMEOUT', 30, cast=int)
+keepalive = env('WEB_KEEPALIVE', 5, cast=int)
+# Recycle workers now and then, bounds the growth of leaky processes
+max_requests = env('WEB_MAX_REQUESTS', 1000, cast=int)
+max_requests_jitter = env('WEB_MAX_REQUESTS_JITTER', 100, cast=int)
+accesslog = '-'
+errorlog = '-'
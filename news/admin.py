@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Tag, News
+from .models import Tag, News, NewsTombstone
 
 
 
@@ -13,4 +13,9 @@ class TagAdmin(admin.ModelAdmin):
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
-    list_display = ('title', 'source', 'created', 'updated')
\ No newline at end of file
+    list_display = ('title', 'source', 'created', 'updated')
+
+
+@admin.register(NewsTombstone)
+class NewsTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('news_id', 'source', 'deleted')
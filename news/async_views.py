@@ -0,0 +1,95 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .models import News
+from .pagination import CustomPagination
+from .serializers import NewsSerializer, LEAN_NEWS_FIELDS, lean_news_data
+from .views import search_news
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+async def _in_thread(function, *args):
+    """
+    Run a blocking ORM call in a thread of its own, with its own database connection.
+    The async ORM of Django 4.2 hands every query to the same thread, so the
+    queries of one request would still run one after the other.
+    Connections are released per CONN_MAX_AGE, like at the end of a request.
+    """
+    def call():
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+    return await sync_to_async(call, thread_sensitive=False)()
+
+
+def _page_size(request):
+    try:
+        page_size = int(request.GET[CustomPagination.page_size_query_param])
+        if page_size > 0:
+            return min(page_size, CustomPagination.max_page_size)
+    except (KeyError, ValueError):
+        pass
+    return CustomPagination.page_size
+
+
+def _page_data(query, offset, limit):
+    """Serialized items of one page, tags included."""
+    return lean_news_data(query.values(*LEAN_NEWS_FIELDS)[offset:offset + limit])
+
+
+async def news_list(request):
+    """
+    Async variant of `GET /news/`, for ASGI servers.
+    Accepts the same filters and page params, the count and the page are
+    queried concurrently and the worker serves other clients meanwhile.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        page_number = int(request.GET.get('page', 1))
+        if page_number < 1:
+            raise ValueError
+    except ValueError:
+        return _json({"detail": "Invalid page."}, status=404)
+    page_size = _page_size(request)
+    # Building the search may query the database, see `trigram_search_enabled`
+    query = await _in_thread(search_news, request.GET)
+
+    count, results = await asyncio.gather(
+        _in_thread(query.count),
+        _in_thread(_page_data, query, (page_number - 1) * page_size, page_size),
+    )
+    if page_number > 1 and not results:
+        return _json({"detail": "Invalid page."}, status=404)
+
+    url = request.build_absolute_uri()
+    has_next = page_number * page_size < count
+    previous = None
+    if page_number > 1:
+        previous = (
+            remove_query_param(url, 'page') if page_number == 2
+            else replace_query_param(url, 'page', page_number - 1)
+        )
+    return _json({
+        "count": count,
+        "next": replace_query_param(url, 'page', page_number + 1) if has_next else None,
+        "previous": previous,
+        "results": results,
+    })
+
+
+async def news_detail(request, pk):
+    """Async variant of `GET /news/<pk>/`, through the async ORM."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        news = await News.objects.defer('search_vector').prefetch_related('tags').aget(pk=pk)
+    except News.DoesNotExist:
+        return _json({"detail": "Not found."}, status=404)
+    return _json(NewsSerializer(news).data)
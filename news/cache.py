@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework.response import Response
+from .conditional import conditional_response
+
+
+logger = logging.getLogger(__name__)
+
+NEWS = 'news'
+TAGS = 'tags'
+# Set of tag names, versions the in-process suggest index
+TAG_NAMES = 'tag_names'
+# Name to id mapping of tags, only changed by renames and deletions
+TAG_IDS = 'tag_ids'
+# Cached responses of a scope are built from the data of these scopes,
+# news payloads embed tag names
+DEPENDENCIES = {
+    NEWS: (NEWS, TAGS),
+    TAGS: (TAGS,),
+    TAG_NAMES: (TAG_NAMES,),
+    TAG_IDS: (TAG_IDS,),
+}
+HITS_KEY = 'news:stats:hits'
+MISSES_KEY = 'news:stats:misses'
+
+
+def _generation_key(scope):
+    return f"news:generation:{scope}"
+
+
+def _safe(operation, default=None):
+    """Run a cache operation, a cache outage degrades to a miss instead of an error."""
+    try:
+        return operation()
+    except Exception as e:
+        logger.warning("Cache unavailable: %s", e)
+        return default
+
+
+def _increment(key, initial=0):
+    """Increment a counter, creating it when missing."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial, timeout=None)
+        return cache.incr(key)
+
+
+def _clock():
+    """Initial generation, taken from the clock so a flushed cache never reuses old ones."""
+    return int(time.time() * 1000)
+
+
+def get_generations(scopes):
+    """Current generation of every scope, starting missing ones."""
+    keys = {scope: _generation_key(scope) for scope in scopes}
+    values = cache.get_many(keys.values())
+    generations = {}
+    for scope, key in keys.items():
+        if key not in values:
+            cache.add(key, _clock(), timeout=None)
+            values[key] = cache.get(key)
+        generations[scope] = values[key]
+    return generations
+
+
+def invalidate(*scopes):
+    """
+    Bump the generation of the given scopes, every cached response built from
+    them stops matching at once, without scanning keys.
+    Inside a transaction the generations are bumped again on commit, so that
+    responses cached before the commit are not served afterwards.
+    """
+    def bump():
+        for scope in scopes:
+            _safe(lambda: _increment(_generation_key(scope), _clock()))
+
+    bump()
+    if connection.in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def generation_token(scope):
+    """Part of a cache key that changes whenever data of `scope` changes."""
+    generations = _safe(lambda: get_generations(DEPENDENCIES[scope]))
+    if generations is None:
+        return None
+    return ':'.join(f"{name}{generation}" for name, generation in sorted(generations.items()))
+
+
+def normalized_params(request):
+    """Query params in a canonical order, empty values dropped."""
+    return sorted(
+        (key, sorted(value for value in values if value))
+        for key, values in request.query_params.lists()
+        if any(values)
+    )
+
+
+def response_key(scope, request):
+    """Cache key of a GET response, or `None` when the cache is unavailable."""
+    token = generation_token(scope)
+    if token is None:
+        return None
+    payload = json.dumps([request.get_host(), request.path, normalized_params(request)])
+    return f"news:response:{scope}:{token}:{hashlib.md5(payload.encode()).hexdigest()}"
+
+
+def cached_response(scope, request, build, validators=None):
+    """
+    Serve a GET response from the cache, or build it with `build()` and cache
+    it when successful.
+    `validators()` returns the (ETag, Last-Modified) of the response, they are
+    cached with it, so conditional requests are answered without any query
+    on a hit and before `build()` on a miss.
+    """
+    key = response_key(scope, request)
+    entry = _safe(lambda: cache.get(key)) if key is not None else None
+    if entry is not None:
+        _safe(lambda: _increment(HITS_KEY))
+        return conditional_response(
+            request, entry['etag'], entry['last_modified'], lambda: Response(entry['data'])
+        )
+    if key is not None:
+        _safe(lambda: _increment(MISSES_KEY))
+
+    etag, last_modified = validators() if validators else (None, None)
+
+    def build_and_store():
+        response = build()
+        if key is not None and response.status_code == 200:
+            entry = {'data': response.data, 'etag': etag, 'last_modified': last_modified}
+            _safe(lambda: cache.set(key, entry, settings.NEWS_RESPONSE_CACHE_SECONDS))
+        return response
+
+    return conditional_response(request, etag, last_modified, build_and_store)
+
+
+def stats():
+    """Hit/miss counters and current generations."""
+    values = _safe(lambda: cache.get_many([HITS_KEY, MISSES_KEY]), {})
+    hits, misses = values.get(HITS_KEY, 0), values.get(MISSES_KEY, 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        "generations": _safe(lambda: get_generations([NEWS, TAGS]), {}),
+    }
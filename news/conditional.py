@@ -0,0 +1,44 @@
+import hashlib
+import json
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Strong ETag of the given validator parts."""
+    digest = hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _set_validators(response, etag, last_modified):
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    # Clients may store the response but have to revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional_response(request, etag, last_modified, build):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 (or 412 for failed
+    If-Match preconditions) before `build()` runs, otherwise build the
+    response and attach the validators.
+    """
+    if etag is None:
+        return build()
+    validators = _set_validators(HttpResponse(), etag, last_modified)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+        response=validators,
+    )
+    if response is not validators:
+        return response
+
+    response = build()
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified)
+    return response
@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import psutil
+
+
+# Counters that add up over the life of a pool, the other stats are current values
+COUNTERS = ('created', 'reused', 'recycled', 'unhealthy', 'failed_starts', 'pages', 'wait_seconds')
+
+
+class PooledDriver:
+    """A browser session of a `DriverPool` with its usage counters."""
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+def browser_memory_mb(driver):
+    """Resident memory of the chromedriver process and the browsers it started, in MB."""
+    process = psutil.Process(driver.service.process.pid)
+    processes = [process, *process.children(recursive=True)]
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss / (1024 * 1024)
+
+
+class DriverPool:
+    """
+    Warm WebDriver sessions kept across scrape runs of a worker process.
+    At most `size` sessions exist at once, `session()` blocks until one is
+    free. Idle sessions are health checked before reuse, and recycled after
+    `max_pages` pages or once their browser grows past `max_memory_mb`.
+    """
+    def __init__(self, factory, size, max_pages=None, max_memory_mb=None, memory=browser_memory_mb):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.memory = memory
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._in_use = 0
+        self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def _healthy(self, session):
+        try:
+            return session.driver.execute_script("return 1") == 1 and bool(session.driver.window_handles)
+        except Exception:
+            return False
+
+    def _worn(self, session):
+        if self.max_pages and session.pages >= self.max_pages:
+            return True
+        if self.max_memory_mb:
+            try:
+                return self.memory(session.driver) > self.max_memory_mb
+            except Exception:
+                return False
+        return False
+
+    def _quit(self, session):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            print(f"Error: {str(e)}")
+
+    def acquire(self):
+        """A healthy session, the most recently used idle one or a new one."""
+        started = time.monotonic()
+        self._slots.acquire()
+        self._count('wait_seconds', time.monotonic() - started)
+        try:
+            while True:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    session = self._idle.pop() if self._idle else None
+                if session is None:
+                    break
+                if self._healthy(session):
+                    self._count('reused')
+                    return self._lease(session)
+                self._count('unhealthy')
+                self._quit(session)
+            try:
+                session = PooledDriver(self.factory())
+            except Exception:
+                self._count('failed_starts')
+                raise
+            self._count('created')
+            return self._lease(session)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _lease(self, session):
+        with self._lock:
+            self._in_use += 1
+        return session
+
+    def release(self, session, pages=1):
+        """Give a session back after `pages` page loads, recycling it when worn out."""
+        session.pages += pages
+        self._count('pages', pages)
+        with self._lock:
+            self._in_use -= 1
+            closed = self._closed
+        try:
+            if closed:
+                self._quit(session)
+            elif self._worn(session):
+                self._count('recycled')
+                self._quit(session)
+            else:
+                with self._lock:
+                    self._idle.append(session)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """Lease a driver for the duration of the block, it is always given back."""
+        session = self.acquire()
+        try:
+            yield session.driver
+        finally:
+            self.release(session)
+
+    def close(self):
+        """Quit the idle sessions, sessions in use are quit when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for session in idle:
+            self._quit(session)
+
+    def stats_since(self, snapshot):
+        """Stats with the counters reduced to their growth since `snapshot`, an earlier `stats()`."""
+        stats = self.stats()
+        for name in COUNTERS:
+            stats[name] = round(stats[name] - snapshot[name], 3)
+        return stats
+
+    def stats(self):
+        """Pool usage counters."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                **self._counters,
+                "wait_seconds": round(self._counters['wait_seconds'], 3),
+            }
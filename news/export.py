@@ -0,0 +1,111 @@
+import csv
+import json
+from datetime import datetime, time
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import News
+
+
+FORMATS = ('ndjson', 'csv')
+FIELDS = ('id', 'title', 'content', 'tags', 'source', 'created', 'updated')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Tag names are joined into a single CSV column
+CSV_TAG_SEPARATOR = '|'
+
+
+def parse_since(value):
+    """
+    Parse an `updated_since` watermark, a datetime or a date in ISO format.
+    Naive values are taken in the current time zone, raises ValueError when invalid.
+    """
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid datetime: {value}")
+        since = datetime.combine(day, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_queryset(tags=None, kws=None, not_kws=None, updated_since=None, tags_mode='all'):
+    """
+    Rows of the exported news items, as plain dicts without tags.
+    Ordered by (updated, id), so the `updated` of the last row is the
+    watermark of the next incremental pull.
+    """
+    query = News.search(tags, kws, not_kws, tags_mode=tags_mode)
+    if updated_since is not None:
+        query = query.filter(updated__gte=updated_since)
+    return query.order_by('updated', 'id').values(
+        'id', 'title', 'content', 'source', 'created', 'updated'
+    )
+
+
+def _attach_tags(rows):
+    """Add the tag names of a chunk of rows with a single query."""
+    tags = {row['id']: [] for row in rows}
+    through = News.tags.through.objects.filter(news_id__in=tags.keys())
+    for news_id, name in through.order_by('tag__name').values_list('news_id', 'tag__name'):
+        tags[news_id].append(name)
+    for row in rows:
+        row['tags'] = tags[row['id']]
+    return rows
+
+
+def iter_rows(query, chunk_size=None):
+    """
+    Stream the rows of `query` with their tags in constant memory.
+    Rows come from a server-side cursor, `chunk_size` at a time, and the
+    tags of each chunk are fetched in one query.
+    """
+    chunk_size = chunk_size or settings.NEWS_EXPORT_CHUNK_SIZE
+    chunk = []
+    for row in query.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from _attach_tags(chunk)
+            chunk = []
+    if chunk:
+        yield from _attach_tags(chunk)
+
+
+def _value(row, field):
+    """Value of a field, datetimes in full ISO format so that watermarks are exact."""
+    value = row[field]
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def ndjson_lines(rows):
+    """One JSON document per line."""
+    for row in rows:
+        yield json.dumps({field: _value(row, field) for field in FIELDS}, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes."""
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """A header line, then one CSV line per row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            CSV_TAG_SEPARATOR.join(row['tags']) if field == 'tags' else _value(row, field)
+            for field in FIELDS
+        ])
+
+
+def render(rows, fmt):
+    """Lines of the export in the given format."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return ndjson_lines(rows) if fmt == 'ndjson' else csv_lines(rows)
@@ -0,0 +1,80 @@
+from django.db import IntegrityError, transaction
+from .models import News, Tag, normalize_tag_name
+from .resolver import resolve_tags
+from . import cache
+from .serializers import NewsBulkItemSerializer
+
+
+CREATED = 'created'
+DUPLICATE = 'duplicate'
+INVALID = 'invalid'
+
+
+def _insert(items):
+    """
+    Write validated items with a fixed number of queries:
+    bulk insert of news, one upsert of the tag names missing from the tag
+    caches, one bulk insert into the through table and one recount of the tags.
+    """
+    news_list = News.objects.bulk_create([
+        News(**{field: value for field, value in data.items() if field != 'tags'})
+        for _, data in items
+    ])
+    tag_ids = resolve_tags(name for _, data in items for name in data.get('tags', []))
+
+    through = News.tags.through
+    links = {
+        (news.id, tag_ids[normalize_tag_name(name)])
+        for news, (_, data) in zip(news_list, items)
+        for name in data.get('tags', [])
+        if normalize_tag_name(name)
+    }
+    through.objects.bulk_create(
+        [through(news_id=news_id, tag_id=tag_id) for news_id, tag_id in links],
+        ignore_conflicts=True,
+    )
+    # The through table got no m2m signals either
+    Tag.refresh_counts(tag_ids.values())
+    return news_list
+
+
+def bulk_ingest(items):
+    """
+    Validate and store many news items at once.
+    Returns one result per input item, in order, with a status of
+    `created`, `duplicate` (source already stored or repeated in the batch)
+    or `invalid` (with the validation errors).
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = NewsBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {'index': index, 'status': INVALID, 'errors': serializer.errors}
+
+    # A source stored by a concurrent writer makes the insert fail, retry once
+    for attempt in range(2):
+        seen = News.existing_sources([data['source'] for _, data in valid])
+        to_create = []
+        for index, data in valid:
+            if data['source'] in seen:
+                results[index] = {'index': index, 'status': DUPLICATE, 'source': data['source']}
+            else:
+                seen.add(data['source'])
+                to_create.append((index, data))
+        try:
+            with transaction.atomic():
+                news_list = _insert(to_create) if to_create else []
+            break
+        except IntegrityError:
+            if attempt:
+                raise
+
+    if news_list:
+        # Bulk inserts send no model signals
+        cache.invalidate(cache.NEWS, cache.TAGS)
+    for news, (index, _) in zip(news_list, to_create):
+        results[index] = {'index': index, 'status': CREATED, 'id': news.id}
+    return results
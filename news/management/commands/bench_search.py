@@ -0,0 +1,100 @@
+import random
+import statistics
+import time
+from unittest import mock
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from news.models import News, check_trigram_indexes
+
+
+WORDS = [
+    'apple', 'samsung', 'android', 'iphone', 'camera', 'battery', 'display', 'processor',
+    'graphics', 'laptop', 'network', 'satellite', 'electric', 'software', 'security',
+    'گوشی', 'دوربین', 'باتری', 'نمایشگر', 'پردازنده', 'هوش', 'مصنوعی', 'خودرو',
+    'برقی', 'ماهواره', 'امنیت', 'نرم‌افزار', 'لپ‌تاپ', 'اینترنت', 'فناوری',
+]
+
+# Search engine, value of NEWS_SEARCH_TRIGRAM
+VARIANTS = {
+    'substring': ('substring', False),
+    'trigram': ('substring', True),
+    'fulltext': ('fulltext', False),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark News.search latency (p50/p99) against archive size. '
+        'Synthetic news are inserted inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000', help='Comma separated archive sizes')
+        parser.add_argument('--queries', type=int, default=50, help='Queries per size and variant')
+        parser.add_argument(
+            '--variants', default=','.join(VARIANTS),
+            help=f"Comma separated search variants: {', '.join(VARIANTS)}"
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _grow(self, start, size):
+        """Insert synthetic news until the archive holds `size` items."""
+        batch = []
+        for i in range(start, size):
+            words = random.choices(WORDS, k=400)
+            batch.append(News(
+                title=' '.join(random.choices(WORDS, k=8)),
+                content=' '.join(words),
+                source=f"https://bench.local/news/{i}",
+            ))
+            if len(batch) == 1000:
+                News.objects.bulk_create(batch)
+                batch = []
+        News.objects.bulk_create(batch)
+
+    def _measure(self, engine, trigram, queries):
+        """Latencies in ms of a first page plus count, like GET /news/?kws="""
+        latencies = []
+        # Forced, so that the trigram lookups are measured whether or not their indexes exist
+        with mock.patch('news.models.trigram_search_enabled', return_value=trigram):
+            for _ in range(queries):
+                keyword = random.choice(WORDS)[:random.randint(4, 6)]
+                started = time.perf_counter()
+                query = News.search(kws=[keyword], engine=engine)
+                query.count()
+                list(query[:10])
+                latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        return statistics.median(latencies), latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        variants = [variant.strip() for variant in options['variants'].split(',')]
+        for variant in variants:
+            if variant not in VARIANTS:
+                self.stderr.write(f"Unknown variant: {variant}")
+                return
+
+        indexed = check_trigram_indexes()
+        if 'trigram' in variants and not indexed:
+            # Search ignores the flag without the indexes, this measures why
+            self.stdout.write(self.style.WARNING(
+                'Trigram indexes are missing (pg_trgm unavailable), the trigram variant runs without them'
+            ))
+
+        self.stdout.write(f"{'size':>8} {'variant':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        with transaction.atomic():
+            existing = News.objects.count()
+            current = existing
+            for size in sizes:
+                if size > current:
+                    self._grow(current, size)
+                    current = size
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE news_news')
+                for variant in variants:
+                    engine, trigram = VARIANTS[variant]
+                    p50, p99 = self._measure(engine, trigram, options['queries'])
+                    self.stdout.write(f"{current:>8} {variant:>10} {p50:>9.2f} {p99:>9.2f}")
+            transaction.set_rollback(True)
@@ -0,0 +1,56 @@
+import gzip
+from django.core.management.base import BaseCommand, CommandError
+from news import export
+
+
+class Command(BaseCommand):
+    help = 'Stream the news archive to NDJSON or CSV, in constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=export.FORMATS, default='ndjson', dest='fmt')
+        parser.add_argument(
+            '--output', default='-',
+            help='Output path, `-` for stdout, a `.gz` suffix compresses it'
+        )
+        parser.add_argument('--tags', nargs='*', default=[], help='Keep items having these tags')
+        parser.add_argument('--kws', nargs='*', default=[], help='Keep items matching these keywords')
+        parser.add_argument('--not-kws', nargs='*', default=[], help='Drop items matching these keywords')
+        parser.add_argument(
+            '--updated-since', default=None,
+            help='Only items updated at or after this ISO 8601 date or datetime'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Rows per round trip (defaults to NEWS_EXPORT_CHUNK_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        updated_since = None
+        if options['updated_since']:
+            try:
+                updated_since = export.parse_since(options['updated_since'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        query = export.export_queryset(
+            tags=options['tags'],
+            kws=options['kws'],
+            not_kws=options['not_kws'],
+            updated_since=updated_since,
+        )
+        lines = export.render(export.iter_rows(query, options['chunk_size']), options['fmt'])
+
+        output = options['output']
+        if output == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        opener = gzip.open if output.endswith('.gz') else open
+        count = 0
+        with opener(output, 'wt', encoding='utf-8', newline='') as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        if options['fmt'] == 'csv':
+            count -= 1
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} news items to {output}"))
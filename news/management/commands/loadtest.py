@@ -0,0 +1,77 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.core.management.base import BaseCommand
+
+
+# Read paths compared by default, relative to --base-url
+PATHS = {
+    'sync': '/news/',
+    'async': '/async/news/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the sync and async news read paths of a running server, '
+        'e.g. gunicorn (WSGI) against uvicorn (ASGI), and print throughput and latencies.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='Server under test')
+        parser.add_argument(
+            '--async-base-url', default=None,
+            help='Server of the async path, when it runs apart (defaults to --base-url)'
+        )
+        parser.add_argument('--query', default='', help='Query string of every request, e.g. kws=apple')
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per path')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def _run(self, url, clients, total, timeout):
+        """Latencies in ms of `total` GETs from `clients` concurrent clients, and the error count."""
+        local = threading.local()
+        latencies, errors = [], []
+
+        def hit(_):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            started = time.perf_counter()
+            try:
+                response = local.session.get(url, timeout=timeout)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            (latencies if ok else errors).append(elapsed)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            list(executor.map(hit, range(total)))
+        return time.perf_counter() - started, sorted(latencies), len(errors)
+
+    def handle(self, *args, **options):
+        bases = {
+            'sync': options['base_url'],
+            'async': options['async_base_url'] or options['base_url'],
+        }
+        self.stdout.write(
+            f"{'path':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for name, path in PATHS.items():
+            url = bases[name].rstrip('/') + path
+            if options['query']:
+                url = f"{url}?{options['query']}"
+            seconds, latencies, errors = self._run(
+                url, options['clients'], options['requests'], options['timeout']
+            )
+            if not latencies:
+                self.stdout.write(f"{name:>6} {'-':>9} {'-':>9} {'-':>9} {errors:>7}")
+                continue
+            p50 = statistics.median(latencies)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f"{name:>6} {len(latencies) / seconds:>9.1f} {p50:>9.2f} {p99:>9.2f} {errors:>7}"
+            )
@@ -1,11 +1,58 @@
 from django.core.management.base import BaseCommand
 from news.scraper import ZoomitScraper
+from news.sinks import build_sink
 
 
 
 class Command(BaseCommand):
     help = 'Scrape news from Zoomit.ir'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Number of concurrent workers (defaults to ZOOMIT_SCRAPER_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--host-interval', type=float, default=None,
+            help='Minimum seconds between two requests to the same host'
+        )
+        parser.add_argument(
+            '--backend', choices=ZoomitScraper.BACKENDS, default=None,
+            help='Fetch backend (defaults to ZOOMIT_SCRAPER_BACKEND)'
+        )
+        parser.add_argument(
+            '--max-pages', type=int, default=None,
+            help='Archive pages to walk, stops earlier at already ingested items'
+        )
+        parser.add_argument(
+            '--output', choices=('jsonl', 'none'), default=None,
+            help='Dump of scraped records (defaults to ZOOMIT_SCRAPER_OUTPUT)'
+        )
+        parser.add_argument('--output-path', default=None, help='Path of the JSONL dump')
+        parser.add_argument(
+            '--gzip', action='store_true', default=None, help='Compress the JSONL dump'
+        )
+        parser.add_argument(
+            '--rotate-mb', type=float, default=None, help='Rotate the JSONL dump after this many MB'
+        )
+
     def handle(self, *args, **options):
-        scraper = ZoomitScraper()
-        scraper.scrape_archive()
\ No newline at end of file
+        sink = build_sink(
+            output=options['output'],
+            path=options['output_path'],
+            compress=options['gzip'],
+            rotate_mb=options['rotate_mb'],
+        )
+        scraper = ZoomitScraper(
+            sink=sink,
+            concurrency=options['concurrency'],
+            host_interval=options['host_interval'],
+            backend=options['backend'],
+            max_pages=options['max_pages'],
+        )
+        stats = scraper.scrape_archive()
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {stats['saved']} of {stats['new']} new articles, "
+            f"skipped {stats['skipped']} known ones "
+            f"({stats['pages_per_second']} pages/s)"
+        ))
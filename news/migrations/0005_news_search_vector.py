@@ -0,0 +1,58 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Keep the normalization in sync with news.models.PERSIAN_CHARS
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('simple', translate(coalesce({row}title, ''), 'يك', 'یک')), 'A') ||
+    setweight(to_tsvector('simple', translate(coalesce({row}content, ''), 'يك', 'یک')), 'B')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION news_news_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER news_news_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON news_news
+    FOR EACH ROW EXECUTE FUNCTION news_news_search_vector_update();
+
+UPDATE news_news SET search_vector = {SEARCH_VECTOR_SQL.format(row='')};
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS news_news_search_vector_trigger ON news_news;
+DROP FUNCTION IF EXISTS news_news_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_alter_news_source'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='news',
+            options={'ordering': ['created'], 'verbose_name': 'news', 'verbose_name_plural': 'all news'},
+        ),
+        migrations.AlterModelOptions(
+            name='tag',
+            options={'ordering': ['name'], 'verbose_name': 'Tag', 'verbose_name_plural': 'Tags'},
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.AddIndex(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_search_vector_gin'),
+        ),
+    ]
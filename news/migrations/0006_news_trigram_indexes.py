@@ -0,0 +1,62 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+# pg_trgm ships with the contrib package, which some Postgres builds lack.
+# The indexes are only created where the extension can be installed.
+CREATE_INDEXES = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS news_title_upper_trgm
+            ON news_news USING gin ((UPPER(title)) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS news_content_upper_trgm
+            ON news_news USING gin ((UPPER(content)) gin_trgm_ops);
+    ELSE
+        RAISE NOTICE 'pg_trgm is not available, trigram indexes were not created';
+    END IF;
+END
+$$;
+"""
+
+DROP_INDEXES = """
+DROP INDEX IF EXISTS news_title_upper_trgm;
+DROP INDEX IF EXISTS news_content_upper_trgm;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_search_vector'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_INDEXES, DROP_INDEXES),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='news',
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'
+                        ),
+                        name='news_title_upper_trgm',
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name='news',
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper('content'), name='gin_trgm_ops'
+                        ),
+                        name='news_content_upper_trgm',
+                    ),
+                ),
+            ],
+        ),
+    ]
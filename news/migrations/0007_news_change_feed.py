@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-18 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_news_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('news_id', models.BigIntegerField()),
+                ('source', models.URLField()),
+                ('deleted', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'news tombstone',
+                'verbose_name_plural': 'news tombstones',
+                'ordering': ['deleted', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['updated', 'id'], name='news_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newstombstone',
+            index=models.Index(fields=['deleted', 'id'], name='news_tombstone_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 19:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_news(apps, schema_editor):
+    Tag = apps.get_model('news', 'Tag')
+    through = apps.get_model('news', 'News').tags.through
+    counts = (
+        through.objects.filter(tag_id=OuterRef('pk'))
+        .order_by().values('tag_id')
+        .annotate(count=Count('*')).values('count')
+    )
+    Tag.objects.update(news_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_news_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='news_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_news, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(models.OrderBy(models.F('news_count'), descending=True), models.F('name'), name='tag_news_count_idx'),
+        ),
+    ]
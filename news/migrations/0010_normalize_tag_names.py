@@ -0,0 +1,52 @@
+import unicodedata
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+PERSIAN_CHARS = str.maketrans({'ي': 'ی', 'ك': 'ک'})
+
+
+def normalize(name):
+    return unicodedata.normalize('NFC', name.strip()).translate(PERSIAN_CHARS)
+
+
+def merge_tags(apps, schema_editor):
+    """Rename tags to their normalized name, merging those that become duplicates."""
+    Tag = apps.get_model('news', 'Tag')
+    through = apps.get_model('news', 'News').tags.through
+
+    groups = {}
+    for tag in Tag.objects.order_by('id'):
+        groups.setdefault(normalize(tag.name), []).append(tag)
+
+    for name, tags in groups.items():
+        keeper, duplicates = tags[0], tags[1:]
+        if duplicates:
+            duplicate_ids = [tag.id for tag in duplicates]
+            links = through.objects.filter(tag_id__in=duplicate_ids).values_list('news_id', flat=True)
+            through.objects.bulk_create(
+                [through(news_id=news_id, tag_id=keeper.id) for news_id in set(links)],
+                ignore_conflicts=True,
+            )
+            Tag.objects.filter(id__in=duplicate_ids).delete()
+        if keeper.name != name:
+            Tag.objects.filter(id=keeper.id).update(name=name)
+
+    counts = (
+        through.objects.filter(tag_id=OuterRef('pk'))
+        .order_by().values('tag_id')
+        .annotate(count=Count('*')).values('count')
+    )
+    Tag.objects.update(news_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_tag_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_tags, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,74 @@
-from django.db import models
-from django.db.models import Q
+import logging
+import time
+import unicodedata
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, models, router
+from django.dispatch import Signal
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Upper
+
+
+# Postgres has no Persian text search configuration, `simple` only lowercases
+# and splits words, which suits both Persian and Latin content.
+SEARCH_CONFIG = 'simple'
+# Arabic letters that Persian text is normalized to, mirrored by the
+# search_vector trigger of migration 0005
+PERSIAN_CHARS = str.maketrans({'ي': 'ی', 'ك': 'ک'})
+SEARCH_ENGINES = ('substring', 'fulltext')
+TAG_MODES = ('all', 'any')
+# Created by migration 0006 only where pg_trgm is available
+TRIGRAM_INDEXES = ('news_title_upper_trgm', 'news_content_upper_trgm')
+
+logger = logging.getLogger(__name__)
+# Missing trigram indexes are looked up again after this many seconds, so that
+# running workers pick up migration 0006 without a restart
+TRIGRAM_RECHECK_SECONDS = 300
+# Whether the trigram indexes exist and when that was checked, per database alias
+_trigram_ready = {}
+
+
+def check_trigram_indexes(using='default'):
+    """Look up whether the trigram indexes of migration 0006 exist, and remember it."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_indexes WHERE indexname = ANY(%s)", [list(TRIGRAM_INDEXES)]
+        )
+        ready = cursor.fetchone()[0] == len(TRIGRAM_INDEXES)
+    if not ready and using not in _trigram_ready and settings.NEWS_SEARCH_TRIGRAM:
+        logger.warning(
+            "NEWS_SEARCH_TRIGRAM is ignored: the trigram indexes of migration 0006 are missing "
+            "(pg_trgm unavailable)"
+        )
+    _trigram_ready[using] = (ready, time.monotonic())
+    return ready
+
+
+def trigram_search_enabled(using='default'):
+    """
+    NEWS_SEARCH_TRIGRAM, honoured only where the trigram indexes exist:
+    without them case-insensitive content matching is a sequential scan,
+    several times slower than the case-sensitive default.
+    Looked up once per process (see `check_trigram_indexes`), missing indexes
+    again every TRIGRAM_RECHECK_SECONDS. The lookup is a query, async code
+    must build searches in a thread.
+    """
+    if not settings.NEWS_SEARCH_TRIGRAM:
+        return False
+    ready, checked = _trigram_ready.get(using, (False, None))
+    if ready or (checked is not None and time.monotonic() - checked < TRIGRAM_RECHECK_SECONDS):
+        return ready
+    return check_trigram_indexes(using)
+
+
+def normalize_tag_name(name):
+    """Canonical form of a tag name: trimmed, NFC, Arabic letters unified to Persian."""
+    return unicodedata.normalize('NFC', name.strip()).translate(PERSIAN_CHARS)
+
+
+# Sent with the created `names` when tags are bulk created, which sends no post_save
+tags_created = Signal()
 
 
 class Tag(models.Model):
@@ -7,15 +76,68 @@ class Tag(models.Model):
     Tag model representing a tag item with name.
     """
     name = models.CharField(max_length=50, unique=True)
+    # Number of news items carrying the tag, see `refresh_counts`
+    news_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = ("Tag")
         verbose_name_plural = ("Tags")
         ordering = ['name']
+        indexes = [
+            # Popular tags, and keyset order of `/tags/?ordering=-news_count`
+            models.Index(F('news_count').desc(), 'name', name='tag_news_count_idx'),
+            # Prefix lookups `name__istartswith`, i.e. UPPER(name) LIKE UPPER('q%')
+            models.Index(OpClass(Upper('name'), name='text_pattern_ops'), name='tag_name_upper_prefix'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def ids_for_names(cls, names):
+        """
+        Map tag names to ids, creating the missing tags, with a single
+        INSERT ... ON CONFLICT (name) DO UPDATE ... RETURNING.
+        The no-op update makes existing rows returned too, names are sent in
+        sorted order so concurrent writers lock them in the same order.
+        """
+        names = sorted(set(names))
+        if not names:
+            return {}
+        connection = connections[router.db_for_write(cls)]
+        quote = connection.ops.quote_name
+        sql = (
+            f"INSERT INTO {quote(cls._meta.db_table)} ({quote('name')}, {quote('news_count')}) "
+            f"VALUES {', '.join(['(%s, 0)'] * len(names))} "
+            f"ON CONFLICT ({quote('name')}) DO UPDATE SET {quote('name')} = EXCLUDED.{quote('name')} "
+            # xmax is 0 for freshly inserted rows
+            f"RETURNING {quote('id')}, {quote('name')}, (xmax = 0)"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, names)
+            rows = cursor.fetchall()
+        created = {name for _, name, inserted in rows if inserted}
+        if created:
+            tags_created.send(sender=cls, names=created)
+        return {name: pk for pk, name, _ in rows}
+
+    @classmethod
+    def refresh_counts(cls, ids=None):
+        """
+        Recount `news_count` of the given tags, or of every tag, with a single
+        UPDATE ... SET news_count = (SELECT COUNT(*) ...). Only rows whose
+        count changed are written, returns their number.
+        """
+        through = News.tags.through
+        counts = (
+            through.objects.filter(tag_id=OuterRef('pk'))
+            .order_by().values('tag_id')
+            .annotate(count=Count('*')).values('count')
+        )
+        actual = Coalesce(Subquery(counts), 0)
+        query = cls.objects.all() if ids is None else cls.objects.filter(pk__in=set(ids))
+        return query.exclude(news_count=actual).update(news_count=actual)
+
 
 class News(models.Model):
     """
@@ -27,32 +149,131 @@ class News(models.Model):
     source = models.URLField(max_length=200, unique=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger from title (weight A) and content (weight B)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['created']
         verbose_name = ("news")
         verbose_name_plural = ("all news")
+        indexes = [
+            GinIndex(fields=['search_vector'], name='news_search_vector_gin'),
+            # Serve `icontains`, which Django compiles to UPPER(col) LIKE UPPER('%kw%'),
+            # only created where pg_trgm is available (see migration 0006)
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='news_title_upper_trgm'),
+            GinIndex(OpClass(Upper('content'), name='gin_trgm_ops'), name='news_content_upper_trgm'),
+            # Keyset order of the change feed and of exports
+            models.Index(fields=['updated', 'id'], name='news_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     @classmethod
-    def search(cls, tags=None, kws=None, not_kws=None):
+    def existing_sources(cls, sources):
         """
-        Search for news items based on tags, keywords, and excluded keywords.
+        Return the subset of the given source URLs that are already stored,
+        using a single query for the whole batch.
         """
-        query = cls.objects.all()
+        if not sources:
+            return set()
+        return set(cls.objects.filter(source__in=set(sources)).values_list('source', flat=True))
+
+    @staticmethod
+    def _text_query(keywords):
+        """OR of phrase queries, one per keyword."""
+        text_query = None
+        for keyword in keywords:
+            phrase = SearchQuery(
+                keyword.translate(PERSIAN_CHARS), search_type='phrase', config=SEARCH_CONFIG
+            )
+            text_query = phrase if text_query is None else text_query | phrase
+        return text_query
+
+    @staticmethod
+    def _substring_q(keywords):
+        """
+        OR of substring matches on title or content.
+        With NEWS_SEARCH_TRIGRAM both columns are matched case-insensitively,
+        which the trigram indexes on UPPER(title) and UPPER(content) serve;
+        the flag is ignored where those indexes are missing.
+        """
+        content_lookup = 'content__icontains' if trigram_search_enabled() else 'content__contains'
         q_object = Q()
+        for keyword in keywords:
+            q_object |= Q(title__icontains=keyword) | Q(**{content_lookup: keyword})
+        return q_object
+
+    @classmethod
+    def _filter_tags(cls, query, tags, mode='all'):
+        """
+        Keep news items tagged with all (or any) of the given tag names.
+        Uses a single subquery over the through table, no join or DISTINCT
+        on the wide news rows:
+        SELECT news_id ... WHERE tag.name IN (...) GROUP BY news_id HAVING COUNT(*) = n
+        Names are normalized like stored ones, so either spelling matches.
+        """
+        names = {normalize_tag_name(name) for name in tags}
+        tagged = cls.tags.through.objects.filter(tag__name__in=names)
+        if mode == 'any':
+            return query.filter(id__in=tagged.values('news_id'))
+        matching = (
+            tagged.values('news_id')
+            .annotate(matched=Count('tag_id'))
+            .filter(matched=len(names))
+            .values('news_id')
+        )
+        return query.filter(id__in=matching)
+
+    @classmethod
+    def search(cls, tags=None, kws=None, not_kws=None, engine=None, relevance=False, tags_mode='all'):
+        """
+        Search for news items based on tags, keywords, and excluded keywords.
+        - tags_mode: `all` keeps items having every tag, `any` items having one of them
+        - engine: `substring` matches keywords anywhere in title or content,
+          `fulltext` matches whole words and phrases through the GIN indexed
+          search_vector (defaults to NEWS_SEARCH_ENGINE)
+        - relevance: with the fulltext engine, order the results by rank
+        """
+        engine = engine or settings.NEWS_SEARCH_ENGINE
+        # The search vector is only needed inside the database
+        query = cls.objects.defer('search_vector')
         if tags:
-            for tag in tags:
-                query = query.filter(tags__name=tag).distinct()
+            query = cls._filter_tags(query, tags, tags_mode)
+        if engine == 'fulltext':
+            if kws:
+                text_query = cls._text_query(kws)
+                query = query.filter(search_vector=text_query)
+                if relevance:
+                    query = query.annotate(
+                        rank=SearchRank(F('search_vector'), text_query)
+                    ).order_by('-rank', *cls._meta.ordering, 'id')
+            if not_kws:
+                query = query.exclude(search_vector=cls._text_query(not_kws))
+            return query
         if kws:
-            for kw in kws:
-                q_object |= Q(title__icontains=kw) | Q(content__contains=kw)
-            query = query.filter(q_object)
-            q_object = Q()
+            query = query.filter(cls._substring_q(kws))
         if not_kws:
-            for not_kw in not_kws:
-                q_object |= Q(title__icontains=not_kw) | Q(content__contains=not_kw)
-            query = query.exclude(q_object)
+            query = query.exclude(cls._substring_q(not_kws))
         return query
+
+
+class NewsTombstone(models.Model):
+    """
+    Record of a deleted news item, so that the change feed can report deletions.
+    Written by a post_delete signal, for single and queryset deletions alike.
+    """
+    news_id = models.BigIntegerField()
+    source = models.URLField(max_length=200)
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = ("news tombstone")
+        verbose_name_plural = ("news tombstones")
+        ordering = ['deleted', 'id']
+        indexes = [
+            models.Index(fields=['deleted', 'id'], name='news_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return self.source
@@ -1,4 +1,17 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from . import cache as response_cache
 
 
 class CustomPagination(PageNumberPagination):
@@ -7,18 +20,187 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a unique ordering, e.g. `(created, id)`.
+    Pages are fetched with `WHERE (created, id) > (last seen)` instead of an
+    OFFSET, and no COUNT runs unless asked for with `with_count`:
+    - `with_count=exact`: exact count, cached for NEWS_COUNT_CACHE_SECONDS
+    - `with_count=estimate`: row estimate of the query planner
+    The view chooses the ordering through its `keyset_ordering` attribute,
+    `-field` sorting descending.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    ordering = ('created', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def encode_cursor(self, values, reverse=False):
+        payload = json.dumps([values, reverse], default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        """Return `(values, reverse)` of the requested cursor, or `None` for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values, reverse = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if len(values) != len(self.fields):
+                raise ValueError
+            return values, bool(reverse)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _position_q(self, values, reverse):
+        """Rows strictly after (or before, in reverse) the given key, compared lexicographically."""
+        q_object = Q()
+        for i, field in enumerate(self.fields):
+            lookup = 'lt' if reverse != self.descending[i] else 'gt'
+            q_branch = Q(**{f"{field}__{lookup}": values[i]})
+            for previous, value in zip(self.fields[:i], values[:i]):
+                q_branch &= Q(**{previous: value})
+            q_object |= q_branch
+        return q_object
+
+    def _key(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cache_scope = getattr(view, 'cache_scope', None)
+        ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        self.fields = tuple(field.lstrip('-') for field in ordering)
+        self.descending = tuple(field.startswith('-') for field in ordering)
+        self.page_size = self.get_page_size(request)
+        self.queryset = queryset
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor[1])
+
+        if cursor:
+            try:
+                queryset = queryset.filter(self._position_q(*cursor))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        order = [
+            f"-{field}" if reverse != descending else field
+            for field, descending in zip(self.fields, self.descending)
+        ]
+        rows = list(queryset.order_by(*order)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.encode_cursor(self._key(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.encode_cursor(self._key(self.page[0]), reverse=True))
+
+    def _link(self, cursor):
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def _count_cache_key(self):
+        """
+        Count cache key of the filters of the request, whatever the page.
+        Keys follow the generation of the view's cache scope, so writes
+        invalidate cached counts.
+        """
+        params = [
+            param for param in response_cache.normalized_params(self.request)
+            if param[0] not in (self.cursor_query_param, self.page_size_query_param, self.count_query_param)
+        ]
+        token = response_cache.generation_token(self.cache_scope) if self.cache_scope else ''
+        digest = hashlib.md5(json.dumps([self.request.path, params]).encode()).hexdigest()
+        return f"news:count:{token}:{digest}"
+
+    def _estimated_count(self):
+        """Row estimate of the planner, free of any scan."""
+        sql, params = self.queryset.order_by().values('pk').query.sql_with_params()
+        with connections[self.queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_count(self):
+        mode = self.request.query_params.get(self.count_query_param)
+        if mode == 'estimate':
+            return self._estimated_count()
+        if mode in ('exact', '1', 'true'):
+            key = self._count_cache_key()
+            count = response_cache._safe(lambda: cache.get(key))
+            if count is None:
+                count = self.queryset.count()
+                response_cache._safe(lambda: cache.set(key, count, settings.NEWS_COUNT_CACHE_SECONDS))
+            return count
+        return None
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        count = self.get_count()
+        if count is not None:
+            response['count'] = count
+        response['results'] = data
+        return Response(response)
+
+
 class PaginationMixin:
     """
     Mixin to add pagination capabilities to APIView classes.
+    Views with a `cursor_pagination_class` switch to it with `?pagination=cursor`,
+    when a `cursor` is given, or by default with NEWS_PAGINATION_MODE = 'cursor'.
     """
+    cursor_pagination_class = None
+
+    def get_pagination_class(self):
+        """Pagination class of the current request."""
+        if self.pagination_class is None or self.cursor_pagination_class is None:
+            return self.pagination_class
+        params = self.request.query_params
+        mode = params.get('pagination') or settings.NEWS_PAGINATION_MODE
+        if mode == 'cursor' or 'cursor' in params:
+            return self.cursor_pagination_class
+        return self.pagination_class
+
     @property
     def paginator(self):
         """The paginator instance associated with the view, or `None`."""
         if not hasattr(self, '_paginator'):
-            if self.pagination_class is None:
+            pagination_class = self.get_pagination_class()
+            if pagination_class is None:
                 self._paginator = None
             else:
-                self._paginator = self.pagination_class()
+                self._paginator = pagination_class()
         return self._paginator
 
     def paginate_queryset(self, queryset):
@@ -0,0 +1,77 @@
+from urllib.parse import urljoin
+from lxml import html as lxml_html
+from lxml.etree import ParserError
+
+
+AD_LABEL = 'تبلیغات'
+ARCHIVE_LINKS_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' scroll-m-16 ')]//a[@href]"
+
+
+def _document(html):
+    """Parse an HTML string, or return `None` for an empty document."""
+    try:
+        return lxml_html.document_fromstring(html)
+    except ParserError:
+        return None
+
+
+def _text(element):
+    """Visible text of an element with whitespace collapsed, like WebElement.text."""
+    return ' '.join(element.text_content().split())
+
+
+def parse_article(html, url):
+    """
+    Extract title, tags and content from the raw HTML of a Zoomit article page.
+    Mirrors `ZoomitScraper._extract_article_data`, an empty title means the page
+    could not be read without JavaScript.
+    """
+    data = {
+        "title": "",
+        "content": "",
+        "tags": [],
+        "source": url,
+    }
+    document = _document(html)
+    if document is None:
+        return data
+
+    headings = document.xpath('//h1')
+    if not headings:
+        return data
+    h1 = headings[0]
+    data["title"] = _text(h1)
+
+    # Tags are the labelled links next to the title
+    parent = h1.getparent()
+    if parent is not None:
+        data["tags"] = [
+            _text(span)
+            for a_tag in parent.xpath('.//a[span]')
+            for span in a_tag.iter('span')
+            if _text(span)
+        ]
+
+    # Content lives in the fifth block of the article, older pages use the fourth
+    paragraphs = document.xpath('(//article)[1]/div[1]/div[5]//p')
+    if not paragraphs:
+        paragraphs = document.xpath('(//article)[1]/div[1]/div[4]//p')
+    data["content"] = '\n'.join([_text(p) for p in paragraphs if _text(p)])
+    return data
+
+
+def parse_archive_links(html, base_url):
+    """Return the absolute article links of an archive page, skipping advertisements."""
+    document = _document(html)
+    if document is None:
+        return []
+
+    urls, seen = [], set()
+    for a_tag in document.xpath(ARCHIVE_LINKS_XPATH):
+        if a_tag.xpath(f".//span[contains(text(), '{AD_LABEL}')]"):
+            continue
+        url = urljoin(base_url, a_tag.get('href').strip())
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
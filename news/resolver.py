@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from .models import Tag, normalize_tag_name
+from . import cache
+
+
+class TagResolver:
+    """
+    Resolve tag names to ids through a process-local LRU, then a map shared
+    in the cache, then `Tag.ids_for_names` for the misses only.
+    Both layers follow the TAG_IDS generation, bumped when a tag is renamed
+    or deleted, creations never change the id of an existing name.
+    Without the cache, every name goes to the database.
+    """
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or settings.NEWS_TAG_LRU_SIZE
+        self._lru = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _key(self, version, name):
+        return f"news:tag-id:{version}:{hashlib.md5(name.encode()).hexdigest()}"
+
+    def _lru_get(self, version, names):
+        with self._lock:
+            if self._version != version:
+                self._lru.clear()
+                self._version = version
+            found = {}
+            for name in names:
+                if name in self._lru:
+                    self._lru.move_to_end(name)
+                    found[name] = self._lru[name]
+            return found
+
+    def _lru_set(self, version, ids):
+        with self._lock:
+            if self._version != version:
+                return
+            self._lru.update(ids)
+            for name in ids:
+                self._lru.move_to_end(name)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def resolve(self, names):
+        """Map tag names to ids, creating the missing tags. Names are normalized first."""
+        names = {normalize_tag_name(name) for name in names} - {''}
+        if not names:
+            return {}
+        version = cache.generation_token(cache.TAG_IDS)
+        if version is None:
+            return Tag.ids_for_names(names)
+
+        ids = self._lru_get(version, names)
+        missing = names - ids.keys()
+        if missing:
+            keys = {self._key(version, name): name for name in missing}
+            shared = cache._safe(lambda: django_cache.get_many(keys.keys()), {})
+            found = {keys[key]: pk for key, pk in shared.items()}
+            ids.update(found)
+            missing -= found.keys()
+            self._lru_set(version, found)
+        if missing:
+            created = Tag.ids_for_names(missing)
+            ids.update(created)
+            # Ids of tags inserted by a transaction that rolls back must not be kept
+            transaction.on_commit(lambda: self._remember(version, created))
+        return ids
+
+    def _remember(self, version, ids):
+        self._lru_set(version, ids)
+        cache._safe(lambda: django_cache.set_many(
+            {self._key(version, name): pk for name, pk in ids.items()},
+            settings.NEWS_TAG_CACHE_SECONDS,
+        ))
+
+
+resolver = TagResolver()
+
+
+def resolve_tags(names):
+    """Ids of the given tag names, keyed by normalized name, see `TagResolver`."""
+    return resolver.resolve(names)
@@ -0,0 +1,166 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from .cache import _safe
+
+
+logger = logging.getLogger(__name__)
+_local_lock = threading.Lock()
+
+# What a trigger does while a run holds the lock
+SKIP = 'skip'
+COALESCE = 'coalesce'
+# Compare-and-act on the lock key, a lease that expired and was taken over by
+# another worker between the check and the action must not be touched
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RunLock:
+    """
+    Single-flight lock of a periodic job, held in the cache (Redis) under a
+    lease. The holder renews the lease with a heartbeat; a worker that dies
+    stops renewing, so its lock expires after `lease` seconds and the next
+    trigger takes over.
+    Triggers arriving meanwhile are skipped, or with COALESCE recorded as a
+    single pending run, started once the current one finishes.
+    Without the cache no run is started, the broker shares the same Redis.
+    Renewal and release only act on the lock while it still holds the token
+    of the caller, in one Lua script on Redis.
+    """
+    def __init__(self, name, lease=None, heartbeat=None):
+        self.name = name
+        self._lease = lease
+        self._heartbeat = heartbeat
+        self.key = f"news:runlock:{name}"
+        self.pending_key = f"news:runlock:{name}:pending"
+        self.status_key = f"news:runlock:{name}:status"
+
+    @property
+    def lease(self):
+        return self._lease or settings.ZOOMIT_SCRAPE_LOCK_LEASE
+
+    @property
+    def heartbeat_interval(self):
+        return self._heartbeat or settings.ZOOMIT_SCRAPE_LOCK_HEARTBEAT
+
+    def acquire(self):
+        """Token of the acquired lock, `None` when a run already holds it."""
+        token = uuid.uuid4().hex
+        if not _safe(lambda: cache.add(self.key, token, self.lease), False):
+            return None
+        self._update_status(running=True, started=time.time(), owner=f"{socket.gethostname()}:{os.getpid()}")
+        return token
+
+    def _if_held(self, token, script, *args, fallback):
+        """
+        Run `script` on the lock key if it holds `token`, atomically on Redis.
+        Other backends (local memory in tests) live in one process, where the
+        check and `fallback()` run under a process lock.
+        """
+        backend = caches['default']
+        if isinstance(backend, RedisCache):
+            key = backend.make_and_validate_key(self.key)
+            client = backend._cache.get_client(key, write=True)
+            return client.eval(script, 1, key, backend._cache._serializer.dumps(token), *args)
+        with _local_lock:
+            if backend.get(self.key) != token:
+                return 0
+            return fallback(backend)
+
+    def renew(self, token):
+        """Extend the lease of a held lock, `False` when it was lost."""
+        renewed = _safe(lambda: self._if_held(
+            token, RENEW_SCRIPT, int(self.lease * 1000),
+            fallback=lambda backend: backend.touch(self.key, self.lease),
+        ), False)
+        if not renewed:
+            logger.warning("Run lock %s lost", self.name)
+        return bool(renewed)
+
+    def release(self, token, result=None, error=None):
+        """
+        Release a held lock and record the outcome of the run.
+        Returns whether a coalesced trigger is pending.
+        """
+        status = self.status()
+        _safe(lambda: self._if_held(
+            token, RELEASE_SCRIPT, fallback=lambda backend: backend.delete(self.key)
+        ))
+        finished = time.time()
+        started = status.get('started') or finished
+        self._update_status(
+            running=False,
+            last_started=started,
+            last_finished=finished,
+            last_duration=round(finished - started, 2),
+            last_result=result,
+            last_error=error,
+        )
+        return bool(_safe(lambda: cache.delete(self.pending_key), False))
+
+    def reject(self, mode=None):
+        """Record a trigger that found the lock held."""
+        mode = mode or settings.ZOOMIT_SCRAPE_OVERLAP
+        if mode == COALESCE:
+            _safe(lambda: cache.set(self.pending_key, True, timeout=None))
+        status = self.status()
+        self._update_status(skipped=status.get('skipped', 0) + 1)
+        return mode
+
+    @contextmanager
+    def heartbeat(self, token):
+        """Renew the lease every `heartbeat_interval` seconds while the block runs."""
+        stopped = threading.Event()
+
+        def beat():
+            while not stopped.wait(self.heartbeat_interval):
+                if not self.renew(token):
+                    return
+                self._update_status(heartbeat=time.time())
+
+        thread = threading.Thread(target=beat, name=f"runlock-{self.name}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def _update_status(self, **values):
+        status = self.status()
+        status.update(values)
+        _safe(lambda: cache.set(self.status_key, status, timeout=None))
+
+    def status(self):
+        """Last recorded run state, `running` reflects whether the lock is held now."""
+        values = _safe(lambda: cache.get_many([self.key, self.status_key, self.pending_key]), {})
+        status = dict(values.get(self.status_key) or {})
+        holder = values.get(self.key)
+        status['running'] = holder is not None
+        status['pending'] = bool(values.get(self.pending_key))
+        if holder is None:
+            status.pop('started', None)
+            status.pop('owner', None)
+            status.pop('heartbeat', None)
+        return status
+
+
+scrape_lock = RunLock('scrape_zoomit')
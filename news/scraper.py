@@ -1,5 +1,10 @@
-import time, django, json, random, os
+import time, django, random, os, threading, atexit, json
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
+import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -12,137 +17,454 @@ from decouple import config
 #Django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 django.setup()
-from news.serializers import NewsSerializer
+from django.conf import settings
+from news.models import News
+from news.ingest import bulk_ingest, CREATED
+from news.parsers import parse_article, parse_archive_links
+from news.sinks import build_sink
+from news.driverpool import DriverPool
 
 
-class ZoomitScraper:
-    """Selenium-based web scraper for Zoomit"""
-    def __init__(self, json_path="news_output.json"):
-        """Initialize the scraper."""
-        self.json_path = json_path
-        self.driver = None
-        self._initialize_json_file()
-        
-        # Random user agents
-        self.user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        ]
-        
-    def _initialize_json_file(self):
-        """Create json file if not exists."""
-        if not os.path.exists(self.json_path):
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump([], f, ensure_ascii=False, indent=2)
-    
-    def _random_delay(self, min=2, max=5):
-        """Random delay."""
-        time.sleep(random.uniform(min, max))
+# Random user agents
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+]
+# Resource types the extraction never reads, blocked through CDP when resource blocking is on
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    "*.css",
+]
+BLOCKING_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+# CSS selectors that must be present before a page is read, with the eager load strategy
+ARTICLE_READY = ("h1", "article")
+ARCHIVE_READY = ("div.scroll-m-16 a",)
+# Title, tags and paragraphs of an article page read in a single WebDriver round trip,
+# same rules as `parse_article`: tags are the labelled links next to the h1, content
+# lives in the fifth block of the article, older pages use the fourth
+EXTRACT_ARTICLE_SCRIPT = """
+const text = (element) => (element.innerText || '').trim();
+const divs = (element) => element ? Array.from(element.children).filter((child) => child.tagName === 'DIV') : [];
+const h1 = document.querySelector('h1');
+const tags = [];
+if (h1 && h1.parentElement) {
+    for (const link of h1.parentElement.querySelectorAll('a')) {
+        if (!Array.from(link.children).some((child) => child.tagName === 'SPAN')) continue;
+        for (const span of link.querySelectorAll('span')) {
+            if (text(span)) tags.push(text(span));
+        }
+    }
+}
+const blocks = divs(divs(document.querySelector('article'))[0]);
+let paragraphs = blocks[4] ? blocks[4].querySelectorAll('p') : [];
+if (!paragraphs.length && blocks[3]) paragraphs = blocks[3].querySelectorAll('p');
+return {
+    title: h1 ? text(h1) : '',
+    tags: tags,
+    paragraphs: Array.from(paragraphs).map(text).filter(Boolean),
+};
+"""
+
+
+class HostThrottle:
+    """
+    Per-host politeness budget shared by all scraper workers.
+    Requests to the same host are spaced at least `min_interval` seconds apart
+    (plus a random jitter), no matter how many workers are running.
+    """
+    def __init__(self, min_interval=1.0, jitter=0.5):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the host of `url` may be requested again."""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval + random.uniform(0, self.jitter)
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def host_resolver_rules(allowed_hosts):
+    """Chrome host resolver rules failing every host but `allowed_hosts`, which blocks third parties."""
+    return ", ".join(["MAP * ~NOTFOUND", *(f"EXCLUDE {host}" for host in allowed_hosts)])
+
+
+def page_traffic(entries):
+    """Bytes received and requests blocked, from the entries of a Chrome performance log."""
+    received = blocked = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        params = message.get("params", {})
+        if message["method"] == "Network.loadingFinished":
+            received += params.get("encodedDataLength", 0)
+        elif message["method"] == "Network.loadingFailed" and (
+            params.get("blockedReason") or params.get("errorText") == "net::ERR_NAME_NOT_RESOLVED"
+        ):
+            blocked += 1
+    return received, blocked
+
+
+def create_driver():
+    """Set up Selenium WebDriver"""
+    options = webdriver.ChromeOptions()
     
-    def _initialize_driver(self):
-        """Set up Selenium WebDriver"""
-        options = webdriver.ChromeOptions()
-        
-        options.add_argument("--headless=new")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        options.add_argument(f"user-agent={random.choice(self.user_agents)}")
-        
-        service = Service(executable_path=config('CHROME_DRIVER_PATH', '/home/ebrahim/Desktop/projects/INTERN/chromedriver-linux64/chromedriver'))
-        # service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.driver.set_page_load_timeout(30)
-        self.driver.set_script_timeout(20)
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
+    # Network events are logged so every run reports the traffic of its pages
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    blocking = settings.ZOOMIT_SELENIUM_BLOCK_RESOURCES
+    if blocking:
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", BLOCKING_PREFS)
+        options.add_argument(f"--host-resolver-rules={host_resolver_rules(settings.ZOOMIT_SELENIUM_ALLOWED_HOSTS)}")
     
-    def _get_page(self, url):
-        """Load a page."""
+    service = Service(executable_path=config('CHROME_DRIVER_PATH', '/home/ebrahim/Desktop/projects/INTERN/chromedriver-linux64/chromedriver'))
+    # service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(30)
+    driver.set_script_timeout(20)
+    if blocking:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Browser pool of this process, shared by every scraper and kept warm across runs."""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool(
+                create_driver,
+                size=settings.ZOOMIT_DRIVER_POOL_SIZE,
+                max_pages=settings.ZOOMIT_DRIVER_MAX_PAGES,
+                max_memory_mb=settings.ZOOMIT_DRIVER_MAX_MEMORY_MB,
+            )
+            atexit.register(_driver_pool.close)
+        return _driver_pool
+
+
+def close_driver_pool():
+    """Quit the warm browsers of this process, a later scrape starts a new pool."""
+    global _driver_pool
+    with _driver_pool_lock:
+        pool, _driver_pool = _driver_pool, None
+    if pool is not None:
+        pool.close()
+        print("Browser closed!")
+
+
+def save_batch(batch, sink):
+    """Save a batch of scraped data into database and the output sink, returns the saved count."""
+    saved = 0
+    scraped_at = datetime.now(tz=pytz.timezone('Asia/Tehran')).isoformat()
+    for data, result in zip(batch, bulk_ingest(batch)):
+        if result['status'] == CREATED:
+            saved += 1
+            sink.write({**data, "scraped_at": scraped_at})
+            print(f"DONE: {data['title']}")
+        else:
+            print(f"PASS: {result.get('errors') or result['status']}")
+    return saved
+
+
+class ZoomitScraper:
+    """
+    Web scraper for Zoomit.
+    Backends:
+    - http: pooled HTTP client and lxml parsing, no browser at all
+    - selenium: every page is rendered by headless Chrome
+    - auto: http first, Chrome only for pages that need JavaScript
+    """
+    BACKENDS = ('auto', 'http', 'selenium')
+    archive_page_param = "pageNumber"
+
+    def __init__(self, sink=None, concurrency=None, host_interval=None, backend=None, max_pages=None,
+                 driver_pool=None):
+        """
+        Initialize the scraper, scraped records are streamed to `sink`.
+        Browsers are leased from `driver_pool`, by default the pool of the process.
+        """
+        self.sink = sink or build_sink()
+        self.max_pages = max(1, max_pages or settings.ZOOMIT_SCRAPER_MAX_PAGES)
+        self.backend = backend or settings.ZOOMIT_SCRAPER_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown scraper backend: {self.backend}")
+        self.concurrency = max(1, concurrency or settings.ZOOMIT_SCRAPER_CONCURRENCY)
+        self.throttle = HostThrottle(
+            min_interval=settings.ZOOMIT_SCRAPER_HOST_INTERVAL if host_interval is None else host_interval
+        )
+        # Every worker thread drives the browser session it leased
+        self._local = threading.local()
+        self._driver_pool = driver_pool
+        self._fallbacks = 0
+        self._browser_stats = self._empty_browser_stats()
+        self._stats_lock = threading.Lock()
+        self.user_agents = USER_AGENTS
+        self.session = self._initialize_session()
+
+    def _initialize_session(self):
+        """Set up a pooled HTTP session shared by all workers."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency, max_retries=2)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = random.choice(self.user_agents)
+        return session
+
+    def _fetch_html(self, url):
+        """Download a page over HTTP."""
+        self.throttle.wait(url)
+        response = self.session.get(url, timeout=settings.ZOOMIT_SCRAPER_HTTP_TIMEOUT)
+        response.raise_for_status()
+        if 'charset' not in response.headers.get('Content-Type', ''):
+            response.encoding = 'utf-8'
+        return response.text
+
+    @property
+    def driver(self):
+        """WebDriver of the current worker thread."""
+        return getattr(self._local, "driver", None)
+
+    @property
+    def driver_pool(self):
+        return self._driver_pool or get_driver_pool()
+
+    @staticmethod
+    def _empty_browser_stats():
+        return {"pages": 0, "seconds": 0.0, "bytes": 0, "blocked": 0}
+
+    def _add_browser_stats(self, **values):
+        with self._stats_lock:
+            for name, value in values.items():
+                self._browser_stats[name] += value
+
+    def _record_traffic(self, driver):
+        """Account the network log of the pages loaded by `driver` since the last call."""
+        try:
+            received, blocked = page_traffic(driver.get_log("performance"))
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return
+        self._add_browser_stats(bytes=received, blocked=blocked)
+
+    def browser_report(self):
+        """Chrome traffic of the current run: pages, page time, bytes received and requests blocked."""
+        with self._stats_lock:
+            stats = dict(self._browser_stats)
+        return {
+            "resource_blocking": settings.ZOOMIT_SELENIUM_BLOCK_RESOURCES,
+            "pages": stats["pages"],
+            "seconds": round(stats["seconds"], 2),
+            "avg_page_seconds": round(stats["seconds"] / stats["pages"], 2) if stats["pages"] else 0.0,
+            "kb_received": round(stats["bytes"] / 1024, 1),
+            "avg_page_kb": round(stats["bytes"] / 1024 / stats["pages"], 1) if stats["pages"] else 0.0,
+            "blocked_requests": stats["blocked"],
+        }
+
+    @contextmanager
+    def _browser(self):
+        """Lease a browser for the current worker thread, given back to the pool when done."""
+        with self.driver_pool.session() as driver:
+            self._local.driver = driver
+            try:
+                yield driver
+            finally:
+                self._local.driver = None
+                self._record_traffic(driver)
+
+    def close(self):
+        """Release the HTTP session, the browsers stay warm in the pool."""
+        self.session.close()
+
+    def _get_page(self, url, ready=()):
+        """
+        Load a page in the leased browser. With resource blocking, loading stops
+        waiting once the `ready` elements exist instead of the whole page.
+        """
+        self.throttle.wait(url)
+        started = time.monotonic()
         try:
             self.driver.get(url)
-            self._random_delay()
-            WebDriverWait(self.driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+            if settings.ZOOMIT_SELENIUM_BLOCK_RESOURCES and ready:
+                WebDriverWait(self.driver, 10).until(
+                    lambda d: all(d.find_elements(By.CSS_SELECTOR, selector) for selector in ready)
+                )
+            else:
+                WebDriverWait(self.driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
         except Exception as e:
             print(f"Error: {str(e)}")
+        finally:
+            self._add_browser_stats(pages=1, seconds=time.monotonic() - started)
     
     def _extract_article_data(self, url):
-        """Extract article data from a single news page."""
-        data = {
-            "title": "",
-            "content": "",
-            "tags": [],
+        """Extract article data from a single news page, in one script call."""
+        WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+        extracted = self.driver.execute_script(EXTRACT_ARTICLE_SCRIPT)
+        return {
+            "title": extracted["title"],
+            "content": '\n'.join(extracted["paragraphs"]),
+            "tags": extracted["tags"],
             "source": url,
         }
-        
-        # Extract title
-        title = WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
-        data["title"] = title.text.strip()
-        
-        # Extract tags
-        h1_elem = self.driver.find_element(By.TAG_NAME, 'h1')
-        parent_elem = h1_elem.find_element(By.XPATH, './..')
-        tag_elements = parent_elem.find_elements(By.XPATH, './/a[span]')
-        data['tags'] = [
-            span.text.strip() 
-            for a_tag in tag_elements 
-            for span in a_tag.find_elements(By.TAG_NAME, 'span')
-            if span.text.strip()
-        ]
-
-        # Extract content
-        article = self.driver.find_element(By.TAG_NAME, "article")
-        first_div = article.find_element(By.XPATH, "./div[1]")
-        sixth_child_div = first_div.find_element(By.XPATH, "./div[5]")
-        paragraphs = sixth_child_div.find_elements(By.TAG_NAME, "p")
-        if len(paragraphs) == 0:
-            sixth_child_div = first_div.find_element(By.XPATH, "./div[4]")
-            paragraphs = sixth_child_div.find_elements(By.TAG_NAME, "p")
-        data["content"] = '\n'.join([p.text.strip() for p in paragraphs if p.text.strip()])
-        return data
     
-    def _save_data(self, data):
-        """Save scraped data into database using serializer and Json file."""
-        serializer = NewsSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            with open(self.json_path, 'r+', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                existing_data.append(
-                    {**data,"scraped_at": datetime.now(tz=pytz.timezone('Asia/Tehran')).isoformat()}
-                    )
-                f.seek(0)
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
-            print(f"DONE: {data['title']}")
-        else:
-            print(f"PASS: {serializer.errors}")
+    def _save_batch(self, batch):
+        """Save a batch of scraped data into database and the output sink, returns the saved count."""
+        return save_batch(batch, self.sink)
+
+    def _fall_back_to_selenium(self, url, reason):
+        """Record that `url` has to be rendered by Chrome."""
+        with self._stats_lock:
+            self._fallbacks += 1
+        print(f"SELENIUM: {url} ({reason})")
+
+    def _archive_page_url(self, archive_url, page):
+        """URL of the given archive page, the first page is the archive itself."""
+        if page == 1:
+            return archive_url
+        parts = urlparse(archive_url)
+        query = dict(parse_qsl(parts.query))
+        query[self.archive_page_param] = page
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    def discover_new_urls(self, archive_url):
+        """
+        Walk the archive pages (newest first) and return the links that are not
+        ingested yet, with the number of known links that were skipped.
+        Pagination stops at the first page that contains an already known item.
+        """
+        urls, seen, skipped = [], set(), 0
+        for page in range(1, self.max_pages + 1):
+            page_urls = [
+                url for url in self._collect_links(self._archive_page_url(archive_url, page))
+                if url not in seen
+            ]
+            seen.update(page_urls)
+            known = News.existing_sources(page_urls)
+            skipped += len(known)
+            urls.extend(url for url in page_urls if url not in known)
+            if not page_urls or known:
+                break
+        return urls, skipped
+
+    def _collect_links(self, archive_url):
+        """Get all article links of the archive page."""
+        if self.backend != 'selenium':
+            try:
+                urls = parse_archive_links(self._fetch_html(archive_url), archive_url)
+            except requests.RequestException as e:
+                if self.backend == 'http':
+                    raise
+                urls = []
+                print(f"Error: {str(e)}")
+            if urls or self.backend == 'http':
+                return urls
+            self._fall_back_to_selenium(archive_url, "no links in raw HTML")
+
+        with self._browser():
+            self._get_page(archive_url, ARCHIVE_READY)
+            links = self.driver.find_elements(By.CSS_SELECTOR, "div.scroll-m-16 a")
+            return [
+                a.get_attribute('href') 
+                for a in links 
+                if a.get_attribute('href') and not a.find_elements(By.XPATH, ".//span[contains(text(), 'تبلیغات')]")
+            ]
+
+    def scrape_article(self, url):
+        """Fetch and extract a single article, runs inside a worker thread."""
+        if self.backend != 'selenium':
+            try:
+                article_data = parse_article(self._fetch_html(url), url)
+            except requests.RequestException as e:
+                if self.backend == 'http':
+                    raise
+                article_data = None
+                print(f"Error: {str(e)}")
+            if self.backend == 'http' or (article_data and article_data["title"]):
+                return article_data
+            self._fall_back_to_selenium(url, "page needs JavaScript")
+
+        with self._browser():
+            self._get_page(url, ARTICLE_READY)
+            return self._extract_article_data(url)
 
     def scrape_archive(self, archive_url="https://www.zoomit.ir/archive/"):
         """Main method to scrape news."""
-        self._initialize_driver()
-        self._get_page(archive_url)        
-
-        # Get all article links
-        links = self.driver.find_elements(By.CSS_SELECTOR, "div.scroll-m-16 a")
-        urls = [
-            a.get_attribute('href') 
-            for a in links 
-            if a.get_attribute('href') and not a.find_elements(By.XPATH, ".//span[contains(text(), 'تبلیغات')]")
-        ]
-        print(f"Found {len(urls)} articles!")
-        
-        for url in urls:
-            self._get_page(url)
-            article_data = self._extract_article_data(url)
-            if article_data["title"]:
-                self._save_data(article_data)
-            
-            self._random_delay()
-
-        self.driver.quit()
-        print("Browser closed!")
+        started = time.monotonic()
+        pages = saved = failed = skipped = 0
+        urls, batch = [], []
+        self._fallbacks = 0
+        self._browser_stats = self._empty_browser_stats()
+        # The pool outlives the run, only its growth during the run is reported
+        pool_stats = self.driver_pool.stats() if self.backend != 'http' else None
+        try:
+            urls, skipped = self.discover_new_urls(archive_url)
+            print(f"Found {len(urls)} new articles, skipped {skipped} already ingested!")
+
+            # Workers only fetch and extract, saving stays in this thread
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {executor.submit(self.scrape_article, url): url for url in urls}
+                for future in as_completed(futures):
+                    pages += 1
+                    try:
+                        article_data = future.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"Error: {futures[future]}: {str(e)}")
+                        continue
+                    if article_data["title"]:
+                        batch.append(article_data)
+                    if len(batch) >= settings.ZOOMIT_SCRAPER_BATCH_SIZE:
+                        saved += self._save_batch(batch)
+                        batch = []
+            if batch:
+                saved += self._save_batch(batch)
+        finally:
+            self.sink.close()
+            self.close()
+
+        elapsed = time.monotonic() - started
+        stats = {
+            "new": len(urls),
+            "skipped": skipped,
+            "pages": pages,
+            "saved": saved,
+            "failed": failed,
+            "selenium_fallbacks": self._fallbacks,
+            "seconds": round(elapsed, 2),
+            "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+        }
+        if self.backend != 'http':
+            stats["browser"] = self.browser_report()
+            stats["driver_pool"] = self.driver_pool.stats_since(pool_stats)
+        print(
+            f"Scraped {pages} pages with {self.concurrency} worker(s) in {elapsed:.1f}s "
+            f"({stats['pages_per_second']} pages/s)"
+        )
+        return stats
 
 
 if __name__ == "__main__":
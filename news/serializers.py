@@ -1,6 +1,9 @@
 from rest_framework import serializers
-from .models import Tag, News
+from rest_framework.settings import api_settings, ISO_8601
+from .models import Tag, News, normalize_tag_name
+from .resolver import resolve_tags
 from django.db import transaction
+from django.utils import timezone
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -8,14 +11,26 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name']
 
-    def validate_name(self, value):
-        value = value.strip()
-        return value
+    def to_internal_value(self, data):
+        # Normalized before the unique validator runs, so names colliding after folding are reported
+        name = data.get('name') if hasattr(data, 'get') else None
+        if isinstance(name, str):
+            data = data.copy()
+            data['name'] = normalize_tag_name(name)
+        return super().to_internal_value(data)
+
+
+class TagCountSerializer(TagSerializer):
+    """Tag with its news count, for tag listings (news payloads embed `TagSerializer`)"""
+    class Meta(TagSerializer.Meta):
+        fields = ['id', 'name', 'news_count']
+        read_only_fields = ['news_count']
 
 
 class NewsSerializer(serializers.ModelSerializer):
     tags = serializers.ListField(
-        child=serializers.CharField(),
+        # Bounded like Tag.name, so that one long tag fails its item instead of the batch
+        child=serializers.CharField(max_length=50),
         required=False,
         write_only=True
     )
@@ -83,10 +98,70 @@ class NewsSerializer(serializers.ModelSerializer):
         Process tags for a news item:
         - If a tag with the given name exists, use it
         - If not, create a new tag
+        Names are normalized and resolved through the tag resolver, only new
+        names reach the database. Tags are linked with a single add, so
+        their news counts are refreshed once, in the transaction of the save.
         """
-        for tag_data in tags_data:
-            tag_name = tag_data.strip()
-            if tag_name:
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                # Add tag to news
-                news.tags.add(tag)
+        tag_ids = resolve_tags(tags_data)
+        if tag_ids:
+            news.tags.add(*tag_ids.values())
+
+
+class NewsBulkItemSerializer(NewsSerializer):
+    """
+    Validate one item of a bulk ingestion.
+    Duplicate sources are resolved for the whole batch at once, so the
+    per-item uniqueness queries are disabled here.
+    """
+    class Meta(NewsSerializer.Meta):
+        extra_kwargs = {'source': {'validators': []}}
+
+    def validate_source(self, value):
+        return value
+
+
+# Columns read by the lean list serializer, in the field order of NewsSerializer
+LEAN_NEWS_FIELDS = ('id', 'title', 'content', 'source', 'created', 'updated')
+
+
+def _datetime(value, field=serializers.DateTimeField()):
+    """Representation of DRF's DateTimeField: current time zone, ISO 8601, `Z` for UTC."""
+    if not value or api_settings.DATETIME_FORMAT is None:
+        return value or None
+    if api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+        return field.to_representation(value)
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def lean_news_data(rows):
+    """
+    Read-only fast path of `NewsSerializer(news, many=True).data` for lists.
+    Builds the payload straight from `.values(*LEAN_NEWS_FIELDS)` rows,
+    with the tags of every row fetched in one query, and renders to the
+    same JSON without the per-field machinery of DRF serializers.
+    """
+    rows = list(rows)
+    tags = {row['id']: [] for row in rows}
+    if tags:
+        links = (
+            News.tags.through.objects.filter(news_id__in=tags.keys())
+            .order_by(*[f"tag__{field}" for field in Tag._meta.ordering])
+            .values_list('news_id', 'tag_id', 'tag__name')
+        )
+        for news_id, tag_id, name in links:
+            tags[news_id].append({'id': tag_id, 'name': name})
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'],
+            'tags_detail': tags[row['id']],
+            'source': row['source'],
+            'created': _datetime(row['created']),
+            'updated': _datetime(row['updated']),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,111 @@
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed, post_migrate
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import News, NewsTombstone, Tag, check_trigram_indexes, tags_created
+from . import cache
+
+
+@receiver([post_save, post_delete], sender=News)
+def invalidate_news(sender, **kwargs):
+    """Drop cached news responses when a news item changes."""
+    cache.invalidate(cache.NEWS)
+
+
+@receiver(post_delete, sender=News)
+def record_tombstone(sender, instance, **kwargs):
+    """Keep a trace of deleted news items for the change feed."""
+    NewsTombstone.objects.create(news_id=instance.id, source=instance.source)
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def invalidate_news_tags(sender, action, **kwargs):
+    """Drop cached news responses when the tags of a news item change."""
+    if action.startswith('post_'):
+        cache.invalidate(cache.NEWS)
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def refresh_tag_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recount the tags whose links changed, in the transaction of the change."""
+    if reverse:
+        # tag.news_items.add(...), only the tag itself changes
+        tag_ids = {instance.pk}
+    elif action == 'pre_clear':
+        instance._cleared_tag_ids = set(instance.tags.values_list('id', flat=True))
+        return
+    elif action == 'post_clear':
+        tag_ids = getattr(instance, '_cleared_tag_ids', set())
+    else:
+        tag_ids = pk_set or set()
+    if action.startswith('post_') and tag_ids and Tag.refresh_counts(tag_ids):
+        cache.invalidate(cache.TAGS)
+
+
+def touch_news(news):
+    """Bump `updated` of the given news items, so the change feed reports them."""
+    news.update(updated=timezone.now())
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def touch_retagged_news(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mark news items whose tags were added, removed or cleared as updated."""
+    if not reverse:
+        news_ids = {instance.pk}
+    elif action == 'pre_clear':
+        # tag.news_items.clear(), the links are gone once it is sent again
+        instance._cleared_news_ids = set(instance.news_items.values_list('id', flat=True))
+        return
+    elif action == 'post_clear':
+        news_ids = getattr(instance, '_cleared_news_ids', set())
+    else:
+        news_ids = pk_set or set()
+    if action.startswith('post_') and news_ids:
+        touch_news(News.objects.filter(pk__in=news_ids))
+
+
+@receiver(post_save, sender=Tag)
+def touch_renamed_tag_news(sender, instance, created, **kwargs):
+    """News payloads embed tag names, a renamed tag updates its news items."""
+    if not created:
+        touch_news(News.objects.filter(tags=instance))
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_deleted_tag_news(sender, instance, **kwargs):
+    """Deleting a tag drops its links without m2m_changed, its news items lose it."""
+    touch_news(News.objects.filter(tags=instance))
+
+
+@receiver(pre_delete, sender=News)
+def remember_tags(sender, instance, **kwargs):
+    """Tags of a news item about to be deleted, their links go with it."""
+    instance._deleted_tag_ids = set(instance.tags.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=News)
+def refresh_deleted_tag_counts(sender, instance, **kwargs):
+    tag_ids = getattr(instance, '_deleted_tag_ids', None)
+    if tag_ids and Tag.refresh_counts(tag_ids):
+        cache.invalidate(cache.TAGS)
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tags(sender, created=False, **kwargs):
+    """Drop cached tag responses, and news ones which embed tag names."""
+    cache.invalidate(cache.TAGS, cache.TAG_NAMES)
+    if not created:
+        # Renamed or deleted, cached name to id mappings may be wrong
+        cache.invalidate(cache.TAG_IDS)
+
+
+@receiver(tags_created, sender=Tag)
+def invalidate_tag_names(sender, **kwargs):
+    """Outdate the suggest index when tags are bulk created."""
+    cache.invalidate(cache.TAG_NAMES)
+
+
+@receiver(post_migrate)
+def refresh_trigram_indexes(sender, using, **kwargs):
+    """Look the trigram indexes up again once migrations ran, 0006 may have created them."""
+    if sender.name == 'news':
+        check_trigram_indexes(using)
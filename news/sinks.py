@@ -0,0 +1,136 @@
+import glob, gzip, json, os, threading
+from datetime import datetime, timedelta
+from django.conf import settings
+
+
+class NullSink:
+    """Sink that drops every record, used when no dump file is wanted."""
+    def write(self, record):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlSink(NullSink):
+    """
+    Append-only newline-delimited JSON sink.
+    Records are appended through a buffered file handle, so writing one record
+    costs O(1) whatever the size of the file. Writes are serialized by a lock
+    and the sink may be shared by concurrent workers.
+    - compress: write gzip members (`.jsonl.gz`)
+    - rotate_bytes: move the file aside once it grows past this size on disk
+    """
+    def __init__(self, path, compress=False, rotate_bytes=None, buffer_size=64 * 1024):
+        if compress and not path.endswith('.gz'):
+            path = f"{path}.gz"
+        self.path = path
+        self.compress = path.endswith('.gz')
+        self.rotate_bytes = rotate_bytes
+        self.buffer_size = buffer_size
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """Open the current file for appending."""
+        self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self.compress:
+            return gzip.open(self.path, 'at', encoding='utf-8')
+        return open(self.path, 'a', encoding='utf-8', buffering=self.buffer_size)
+
+    def _rotate(self):
+        """Close the current file and move it aside with a timestamp."""
+        self._file.close()
+        self._file = None
+        when = datetime.now()
+        while os.path.exists(rotated_path(self.path, when)):
+            when += timedelta(microseconds=1)
+        os.replace(self.path, rotated_path(self.path, when))
+
+    def write(self, record):
+        """Append one record."""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(line)
+            if self.compress:
+                # Compressed bytes on disk, like the size the file was opened
+                # with; output still held by the compressor counts once flushed
+                self._size = self._file.buffer.fileobj.tell()
+            else:
+                self._size += len(line.encode('utf-8'))
+            if self.rotate_bytes and self._size >= self.rotate_bytes:
+                self._rotate()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """Flush and close the file, the next write reopens it."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _split_suffix(path):
+    """Split `news.jsonl.gz` into (`news`, `.jsonl.gz`)."""
+    base, ext = os.path.splitext(path)
+    if ext == '.gz':
+        base, inner = os.path.splitext(base)
+        ext = inner + ext
+    return base, ext
+
+
+def rotated_path(path, when):
+    """Name of a rotated file, e.g. `news_output.20250101T120000000000.jsonl`."""
+    base, ext = _split_suffix(path)
+    return f"{base}.{when.strftime('%Y%m%dT%H%M%S%f')}{ext}"
+
+
+def iter_records(path, include_rotated=True):
+    """
+    Stream the records of a JSONL dump one by one, in constant memory.
+    Rotated files are read first, oldest to newest, then the current file.
+    """
+    paths = []
+    if include_rotated:
+        base, ext = _split_suffix(path)
+        paths.extend(sorted(glob.glob(f"{glob.escape(base)}.*{ext}")))
+    if os.path.exists(path):
+        paths.append(path)
+
+    for file_path in paths:
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def build_sink(output=None, path=None, compress=None, rotate_mb=None):
+    """Build the output sink of a scrape run, defaults come from settings."""
+    output = output or settings.ZOOMIT_SCRAPER_OUTPUT
+    if output == 'none':
+        return NullSink()
+    if output != 'jsonl':
+        raise ValueError(f"Unknown scraper output: {output}")
+    rotate_mb = settings.ZOOMIT_SCRAPER_OUTPUT_ROTATE_MB if rotate_mb is None else rotate_mb
+    return JsonlSink(
+        path or settings.ZOOMIT_SCRAPER_OUTPUT_PATH,
+        compress=settings.ZOOMIT_SCRAPER_OUTPUT_GZIP if compress is None else compress,
+        rotate_bytes=int(rotate_mb * 1024 * 1024) or None,
+    )
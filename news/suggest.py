@@ -0,0 +1,79 @@
+import threading
+from sortedcontainers import SortedList
+from .models import Tag, PERSIAN_CHARS
+from . import cache
+
+
+# Arabic forms of the Persian letters normalized by PERSIAN_CHARS
+ARABIC_CHARS = str.maketrans({'ی': 'ي', 'ک': 'ك'})
+
+
+def normalize(text):
+    """Key of a tag name: case folded, Arabic letters replaced by their Persian forms."""
+    return text.strip().translate(PERSIAN_CHARS).casefold()
+
+
+class TagIndex:
+    """
+    In-process sorted index of tag names, answering prefix queries with a
+    bisection instead of a query. Entries are `(key, name, id)` tuples.
+    The index is tied to the TAG_NAMES generation, it is rebuilt by the
+    first request that finds it outdated; concurrent requests meanwhile
+    fall back to the database instead of waiting.
+    """
+    def __init__(self):
+        self.entries = SortedList()
+        self.version = None
+        self._lock = threading.Lock()
+
+    def build(self, version):
+        entries = SortedList(
+            (normalize(name), name, pk) for pk, name in Tag.objects.values_list('id', 'name')
+        )
+        self.entries, self.version = entries, version
+
+    def search(self, prefix, limit):
+        """Tags whose key starts with `prefix`, in key order."""
+        results = []
+        for key, name, pk in self.entries.irange(minimum=(prefix,)):
+            if not key.startswith(prefix) or len(results) == limit:
+                break
+            results.append({'id': pk, 'name': name})
+        return results
+
+    def suggest(self, query, limit):
+        """
+        Tags starting with `query`, from the index when it is current,
+        otherwise from the database.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        version = cache.generation_token(cache.TAG_NAMES)
+        if version is not None and self.version != version and self._lock.acquire(blocking=False):
+            try:
+                if self.version != version:
+                    self.build(version)
+            finally:
+                self._lock.release()
+        if version is not None and self.version == version:
+            return self.search(prefix, limit)
+        return search_database(query, limit)
+
+
+def search_database(query, limit):
+    """
+    Tags starting with `query`, through the UPPER(name) text_pattern_ops index.
+    Names are stored as written, so the Persian and Arabic spellings of the
+    prefix are both looked up.
+    """
+    query = query.strip()
+    prefixes = {query, query.translate(PERSIAN_CHARS), query.translate(ARABIC_CHARS)}
+    tags = Tag.objects.none()
+    for prefix in prefixes:
+        tags |= Tag.objects.filter(name__istartswith=prefix)
+    tags = tags.order_by('name').values('id', 'name')[:limit]
+    return list(tags)
+
+
+index = TagIndex()
@@ -1,11 +1,151 @@
-from celery import shared_task
-from .scraper import ZoomitScraper
+import random
+from celery import chord, shared_task
+from celery.signals import worker_process_shutdown, worker_shutdown
+from django.conf import settings
+from .scraper import ZoomitScraper, save_batch, close_driver_pool
+from .sinks import build_sink, NullSink
+from .models import Tag
+from .runlock import scrape_lock, COALESCE
+from . import cache
 
 
+ARCHIVE_URL = "https://www.zoomit.ir/archive/"
+# Scraper of each worker process and backend, its HTTP pool and browser are reused across tasks
+_scrapers = {}
+
+
+def _worker_scraper(backend=None):
+    backend = backend or settings.ZOOMIT_SCRAPER_BACKEND
+    if backend not in _scrapers:
+        _scrapers[backend] = ZoomitScraper(sink=NullSink(), concurrency=1, backend=backend)
+    return _scrapers[backend]
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def _close_browsers(**kwargs):
+    """Quit the warm browsers of the worker process when it stops."""
+    close_driver_pool()
+
+
+def _finish_run(lock, result=None, error=None):
+    """Release the scrape lock, starting the trigger coalesced meanwhile if any."""
+    if lock and scrape_lock.release(lock, result=result, error=error):
+        scrape_zoomit.delay()
+
+
+@shared_task()
+def scrape_zoomit(concurrency=None, backend=None, max_pages=None, output=None):
+    """
+    Task to scrape Zoomit website, fanned out over the workers with ZOOMIT_SCRAPER_FANOUT.
+    Runs one at a time under `scrape_lock`, overlapping triggers are skipped or coalesced.
+    """
+    lock = scrape_lock.acquire()
+    if lock is None:
+        mode = scrape_lock.reject()
+        print(f"A scrape is already running, trigger {'coalesced' if mode == COALESCE else 'skipped'}!")
+        return {"overlap": mode}
+    if settings.ZOOMIT_SCRAPER_FANOUT:
+        try:
+            return discover_zoomit.delay(backend=backend, max_pages=max_pages, output=output, lock=lock).id
+        except Exception as e:
+            _finish_run(lock, error=str(e))
+            raise
+    scraper = ZoomitScraper(
+        sink=build_sink(output=output),
+        concurrency=concurrency,
+        backend=backend,
+        max_pages=max_pages,
+    )
+    result = error = None
+    try:
+        with scrape_lock.heartbeat(lock):
+            result = scraper.scrape_archive()
+        return result
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        _finish_run(lock, result=result, error=error)
+
+
+@shared_task()
+def discover_zoomit(archive_url=ARCHIVE_URL, backend=None, max_pages=None, output=None, lock=None):
+    """
+    First step of a fanned out scrape: list the new articles of the archive,
+    then fetch them in parallel with one `fetch_article` task each, chorded
+    into `persist_articles`.
+    The scrape lock, if any, is renewed by every step and released by the last one.
+    """
+    try:
+        if lock:
+            scrape_lock.renew(lock)
+        scraper = ZoomitScraper(sink=NullSink(), concurrency=1, backend=backend, max_pages=max_pages)
+        try:
+            urls, skipped = scraper.discover_new_urls(archive_url)
+        finally:
+            scraper.close()
+        print(f"Found {len(urls)} new articles, skipped {skipped} already ingested!")
+        if not urls:
+            result = {"new": 0, "skipped": skipped}
+            _finish_run(lock, result=result)
+            return result
+        chord(
+            [fetch_article.s(url, backend=backend, lock=lock) for url in urls]
+        )(persist_articles.s(output=output, lock=lock))
+    except Exception as e:
+        _finish_run(lock, error=str(e))
+        raise
+    return {"new": len(urls), "skipped": skipped}
+
+
+@shared_task(bind=True, acks_late=True, max_retries=None, rate_limit=settings.ZOOMIT_FETCH_RATE_LIMIT)
+def fetch_article(self, url, backend=None, lock=None):
+    """
+    Fetch and extract one article, retried with exponential backoff.
+    A page still failing after ZOOMIT_FETCH_RETRIES retries is reported
+    instead of raised, so that one bad page does not fail the whole chord.
+    """
+    if lock:
+        scrape_lock.renew(lock)
+    try:
+        return _worker_scraper(backend).scrape_article(url)
+    except Exception as e:
+        if self.request.retries < settings.ZOOMIT_FETCH_RETRIES:
+            countdown = min(
+                settings.ZOOMIT_FETCH_RETRY_BACKOFF * 2 ** self.request.retries,
+                settings.ZOOMIT_FETCH_RETRY_BACKOFF_MAX,
+            )
+            raise self.retry(exc=e, countdown=countdown + random.uniform(0, 1))
+        print(f"Error: {url}: {str(e)}")
+        return {"source": url, "error": str(e)}
+
+
+@shared_task()
+def persist_articles(articles, output=None, lock=None):
+    """Last step of a fanned out scrape: save the fetched articles in batches"""
+    result = error = None
+    try:
+        articles = [article for article in articles if article]
+        extracted = [article for article in articles if article.get("title")]
+        failed = sum(1 for article in articles if article.get("error"))
+        saved = 0
+        with build_sink(output=output) as sink:
+            for start in range(0, len(extracted), settings.ZOOMIT_SCRAPER_BATCH_SIZE):
+                saved += save_batch(extracted[start:start + settings.ZOOMIT_SCRAPER_BATCH_SIZE], sink)
+        result = {"pages": len(articles), "saved": saved, "failed": failed}
+        return result
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        _finish_run(lock, result=result, error=error)
+
 
 @shared_task()
-def scrape_zoomit():
-    """Task to scrape Zoomit website"""
-    scraper = ZoomitScraper()
-    scraper.scrape_archive()
-    return "Zoomit scraping completed successfully"
+def rebuild_tag_counts():
+    """Recount the news of every tag, fixes counts drifted by concurrent writers"""
+    changed = Tag.refresh_counts()
+    if changed:
+        cache.invalidate(cache.TAGS)
+    return changed
@@ -0,0 +1,73 @@
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from news import models
+from news.models import News, Tag
+
+
+
+class AsyncNewsTest(TransactionTestCase):
+    # Count and page queries run in other threads, which must see committed rows
+    def setUp(self):
+        self.client = APIClient()
+        self.async_client = AsyncClient()
+        self.tag1 = Tag.objects.create(name="technology")
+        self.tag2 = Tag.objects.create(name="science")
+        for i in range(5):
+            news = News.objects.create(
+                title=f"Test News {i}",
+                content=f"This is test content {i}",
+                source=f"https://example.com/news{i}"
+            )
+            news.tags.add(self.tag1)
+            if i % 2:
+                news.tags.add(self.tag2)
+
+    async def test_list_matches_sync(self):
+        """Test that the async list returns the same payload as the sync one"""
+        for query in ('', '?page_size=2&page=2', '?tags=science', '?kws=content 3'):
+            response = await self.async_client.get(f"{reverse('news:async-news-list')}{query}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            expected = await self._sync_get(f"{reverse('news:news-list')}{query}")
+            data = response.json()
+            self.assertEqual(data['count'], expected['count'])
+            self.assertEqual(data['results'], expected['results'])
+            self.assertEqual(
+                data['next'] and data['next'].replace('/async', ''), expected['next']
+            )
+
+    async def test_trigram_lookup_off_the_event_loop(self):
+        """Test that the trigram index lookup of a keyword search does not run on the event loop"""
+        with override_settings(NEWS_SEARCH_TRIGRAM=True), mock.patch.dict(models._trigram_ready, clear=True):
+            response = await self.async_client.get(f"{reverse('news:async-news-list')}?kws=content 3")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['count'], 1)
+            self.assertIn('default', models._trigram_ready)
+
+    async def test_invalid_page(self):
+        """Test that out of range pages are not found"""
+        response = await self.async_client.get(f"{reverse('news:async-news-list')}?page=9")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_detail(self):
+        """Test retrieving a news item through the async ORM"""
+        news = await News.objects.aget(source="https://example.com/news1")
+        response = await self.async_client.get(reverse('news:async-news-detail', args=[news.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in response.json()['tags_detail']], ['science', 'technology']
+        )
+        response = await self.async_client.get(reverse('news:async-news-detail', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_read_only(self):
+        """Test that the async path only serves reads"""
+        response = await self.async_client.post(reverse('news:async-news-list'), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def _sync_get(self, url):
+        response = await sync_to_async(self.client.get)(url)
+        return response.json()
@@ -0,0 +1,147 @@
+import time
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework import status
+from news.models import News, Tag
+from news.ingest import bulk_ingest
+from news import cache
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tag = Tag.objects.create(name="technology")
+        self.news = News.objects.create(
+            title="Test News",
+            content="This is test content",
+            source="https://example.com/news"
+        )
+        self.news.tags.add(self.tag)
+
+    def test_hit_needs_no_query(self):
+        """Test that a repeated GET is served from the cache"""
+        url = f"{reverse('news:news-list')}?kws=test&tags=technology"
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(f"{reverse('news:news-list')}?tags=technology&kws=test")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_writes_invalidate(self):
+        """Test that model writes and bulk ingestion invalidate cached responses"""
+        url = reverse('news:news-list')
+        self.assertEqual(self.client.get(url).data['count'], 1)
+
+        News.objects.create(title="Other", content="Other", source="https://example.com/other")
+        self.assertEqual(self.client.get(url).data['count'], 2)
+
+        bulk_ingest([{"title": "Bulk", "content": "Bulk", "source": "https://example.com/bulk"}])
+        self.assertEqual(self.client.get(url).data['count'], 3)
+
+        News.objects.filter(source="https://example.com/bulk").delete()
+        self.assertEqual(self.client.get(url).data['count'], 2)
+
+    def test_tag_changes_invalidate_news(self):
+        """Test that renaming a tag refreshes the cached news payloads"""
+        url = reverse('news:news-detail', args=[self.news.id])
+        self.assertEqual(self.client.get(url).data['tags_detail'][0]['name'], 'technology')
+        self.tag.name = "tech"
+        self.tag.save()
+        self.assertEqual(self.client.get(url).data['tags_detail'][0]['name'], 'tech')
+
+    def test_stats_endpoint(self):
+        """Test that cache stats are exposed to admins only"""
+        url = reverse('news:cache-stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        admin = get_user_model().objects.create_user(
+            "09120000000", "admin@example.com", "Admin", "User", "password", is_admin=True
+        )
+        self.client.force_authenticate(admin)
+        self.client.get(reverse('news:tag-list'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['misses'], 1)
+        self.assertIn('news', response.data['generations'])
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tag = Tag.objects.create(name="technology")
+        self.news = News.objects.create(
+            title="Test News",
+            content="This is test content",
+            source="https://example.com/news"
+        )
+        self.news.tags.add(self.tag)
+
+    def test_if_none_match(self):
+        """Test that an unchanged news list is answered with 304"""
+        url = f"{reverse('news:news-list')}?tags=technology"
+        with override_settings(NEWS_RESPONSE_CACHE_SECONDS=0):
+            response = self.client.get(url)
+            etag = response.headers['ETag']
+            self.assertNotIn('Last-Modified', response.headers)
+
+            # Uncached response, validators are computed with a single query
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.news.title = "Changed"
+        self.news.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_if_modified_since_not_stale(self):
+        """Test that If-Modified-Since alone never gets a 304 hiding a change"""
+        since = http_date(time.time() + 60)
+        list_url = reverse('news:news-list')
+        detail_url = reverse('news:news-detail', args=[self.news.id])
+        other = News.objects.create(title="Other", content="Other", source="https://example.com/other")
+        self.client.get(list_url)
+        other.delete()
+        response = self.client.get(list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+        self.client.get(detail_url)
+        self.tag.name = "tech"
+        self.tag.save()
+        response = self.client.get(detail_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in response.data['tags_detail']], ["tech"])
+
+        self.news.tags.add(Tag.objects.create(name="science"))
+        response = self.client.get(detail_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(tag['name'] for tag in response.data['tags_detail']), ["science", "tech"])
+
+    def test_deletion_changes_etag(self):
+        """Test that deleting a news item changes the list validators"""
+        other = News.objects.create(title="Other", content="Other", source="https://example.com/other")
+        url = reverse('news:news-list')
+        etag = self.client.get(url).headers['ETag']
+        other.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_tags_etag(self):
+        """Test that tag lists are validated by the tag change counter"""
+        url = reverse('news:tag-list')
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        Tag.objects.create(name="science")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
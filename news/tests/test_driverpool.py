@@ -0,0 +1,167 @@
+import threading
+from unittest import mock
+from django.test import SimpleTestCase
+from news.driverpool import DriverPool
+from news.scraper import ZoomitScraper
+from news.sinks import NullSink
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_calls = 0
+        self.memory = 100
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        return 1
+
+    @property
+    def window_handles(self):
+        return ["main"] if self.alive else []
+
+    def get_log(self, kind):
+        return []
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class DriverPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.drivers = []
+
+    def _factory(self):
+        driver = FakeDriver()
+        self.drivers.append(driver)
+        return driver
+
+    def _pool(self, **kwargs):
+        kwargs.setdefault('size', 2)
+        return DriverPool(self._factory, memory=lambda driver: driver.memory, **kwargs)
+
+    def test_sessions_are_reused(self):
+        """Test that a released session serves the next lease"""
+        pool = self._pool()
+        for _ in range(3):
+            with pool.session():
+                pass
+        self.assertEqual(len(self.drivers), 1)
+        self.assertEqual(pool.stats()['reused'], 2)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_recycled_after_max_pages(self):
+        """Test that a session is replaced once it served `max_pages` pages"""
+        pool = self._pool(max_pages=2)
+        for _ in range(4):
+            with pool.session():
+                pass
+        self.assertEqual(len(self.drivers), 2)
+        self.assertEqual([driver.quit_calls for driver in self.drivers], [1, 1])
+        self.assertEqual(pool.stats()['recycled'], 2)
+
+    def test_recycled_on_memory_growth(self):
+        """Test that a session whose browser grew too large is replaced"""
+        pool = self._pool(max_memory_mb=500)
+        with pool.session() as driver:
+            driver.memory = 600
+        with pool.session() as driver:
+            self.assertIsNot(driver, self.drivers[0])
+        self.assertEqual(self.drivers[0].quit_calls, 1)
+
+    def test_unhealthy_session_replaced(self):
+        """Test that a dead idle session is quit instead of handed out"""
+        pool = self._pool()
+        with pool.session() as driver:
+            driver.alive = False
+        with pool.session() as driver:
+            self.assertTrue(driver.alive)
+        self.assertEqual(pool.stats()['unhealthy'], 1)
+        self.assertEqual(self.drivers[0].quit_calls, 1)
+
+    def test_released_on_error(self):
+        """Test that a session is given back when the page fails"""
+        pool = self._pool(size=1)
+        with self.assertRaises(ValueError):
+            with pool.session():
+                raise ValueError("boom")
+        self.assertEqual(pool.stats()['in_use'], 0)
+        with pool.session() as driver:
+            self.assertIs(driver, self.drivers[0])
+
+    def test_size_is_bounded(self):
+        """Test that leases beyond the pool size wait for a release"""
+        pool = self._pool(size=1)
+        session = pool.acquire()
+        acquired = threading.Event()
+
+        def lease():
+            with pool.session():
+                acquired.set()
+
+        thread = threading.Thread(target=lease)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        pool.release(session)
+        thread.join()
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(len(self.drivers), 1)
+
+    def test_close(self):
+        """Test that closing quits idle sessions now and leased ones on release"""
+        pool = self._pool()
+        idle = pool.acquire()
+        leased = pool.acquire()
+        pool.release(idle)
+        pool.close()
+        self.assertEqual(idle.driver.quit_calls, 1)
+        pool.release(leased)
+        self.assertEqual(leased.driver.quit_calls, 1)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+    def test_stats_since(self):
+        """Test that counters are reported as their growth since a snapshot"""
+        pool = self._pool()
+        with pool.session():
+            pass
+        snapshot = pool.stats()
+        for _ in range(2):
+            with pool.session():
+                pass
+        stats = pool.stats_since(snapshot)
+        self.assertEqual((stats['created'], stats['reused'], stats['pages']), (0, 2, 2))
+        self.assertEqual(stats['idle'], 1)
+
+    def test_run_reports_its_own_pool_usage(self):
+        """Test that a scrape run reports the pool usage of that run only"""
+        pool = self._pool()
+        with pool.session():
+            pass
+        scraper = ZoomitScraper(sink=NullSink(), backend="selenium", host_interval=0, driver_pool=pool)
+
+        def discover_new_urls(url):
+            with scraper._browser():
+                pass
+            return [], 0
+
+        with mock.patch.object(scraper, 'discover_new_urls', discover_new_urls):
+            stats = scraper.scrape_archive()
+        self.assertEqual(stats["driver_pool"]["pages"], 1)
+        self.assertEqual(stats["driver_pool"]["created"], 0)
+        self.assertEqual(pool.stats()["pages"], 2)
+
+    def test_scraper_gives_browser_back(self):
+        """Test that the scraper leases browsers per page and gives them back on errors"""
+        pool = self._pool(size=1)
+        scraper = ZoomitScraper(sink=NullSink(), backend="selenium", host_interval=0, driver_pool=pool)
+        with mock.patch.object(ZoomitScraper, '_get_page'), \
+                mock.patch.object(ZoomitScraper, '_extract_article_data', side_effect=ValueError("boom")):
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    scraper.scrape_article("https://www.zoomit.ir/a/")
+        self.assertIsNone(scraper.driver)
+        self.assertEqual(pool.stats()['in_use'], 0)
+        self.assertEqual(pool.stats()['pages'], 2)
+        self.assertEqual(len(self.drivers), 1)
@@ -0,0 +1,99 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from news.models import News, Tag
+from news import export
+
+
+
+class NewsExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tag1 = Tag.objects.create(name="technology")
+        self.tag2 = Tag.objects.create(name="science")
+        self.news = []
+        for i in range(5):
+            news = News.objects.create(
+                title=f"Test News {i}",
+                content=f"This is test content {i}",
+                source=f"https://example.com/news{i}"
+            )
+            news.tags.add(self.tag1)
+            if i % 2:
+                news.tags.add(self.tag2)
+            self.news.append(news)
+
+    def _lines(self, response):
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_ndjson(self):
+        """Test that every news item is streamed as one JSON line with its tags"""
+        response = self.client.get(reverse('news:news-export'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual([row['id'] for row in rows], [news.id for news in self.news])
+        self.assertEqual(rows[1]['tags'], ['science', 'technology'])
+        self.assertEqual(rows[0]['tags'], ['technology'])
+        # Adding the tags touched `updated`
+        self.news[0].refresh_from_db()
+        self.assertEqual(rows[0]['updated'], self.news[0].updated.isoformat())
+
+    def test_csv(self):
+        """Test the CSV export"""
+        response = self.client.get(f"{reverse('news:news-export')}?fmt=csv&tags=science")
+        rows = list(csv.DictReader(io.StringIO('\n'.join(self._lines(response)))))
+        self.assertEqual([row['title'] for row in rows], ["Test News 1", "Test News 3"])
+        self.assertEqual(rows[0]['tags'], 'science|technology')
+
+    def test_filters(self):
+        """Test keyword and updated_since filters"""
+        News.objects.filter(pk=self.news[0].pk).update(updated=timezone.now() - timedelta(days=2))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        response = self.client.get(
+            reverse('news:news-export'), {'updated_since': since, 'not_kws': 'content 4'}
+        )
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual([row['title'] for row in rows], [f"Test News {i}" for i in (1, 2, 3)])
+
+    def test_tags_filter_arabic_spelling(self):
+        """Test that the tags filter matches stored tags spelled with Arabic letters"""
+        self.news[2].tags.add(Tag.objects.create(name="کتاب"))
+        response = self.client.get(reverse('news:news-export'), {'tags': 'كتاب'})
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual([row['title'] for row in rows], ["Test News 2"])
+
+    def test_invalid_params(self):
+        """Test that unknown formats and invalid watermarks are rejected"""
+        response = self.client.get(f"{reverse('news:news-export')}?fmt=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f"{reverse('news:news-export')}?updated_since=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunks(self):
+        """Test that tags are attached with one query per chunk"""
+        query = export.export_queryset()
+        rows = export.iter_rows(query, chunk_size=2)
+        with self.assertNumQueries(4):
+            rows = list(rows)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[3]['tags'], ['science', 'technology'])
+
+    def test_command(self):
+        """Test that the export command writes a gzip NDJSON file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'news.ndjson.gz')
+            call_command('export_news', output=path, tags=['science'], stderr=io.StringIO())
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([row['id'] for row in rows], [self.news[1].id, self.news[3].id])
@@ -0,0 +1,108 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from news.models import News, NewsTombstone, Tag
+from news import feed
+
+
+
+@override_settings(NEWS_CHANGES_SETTLE_SECONDS=0)
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tag = Tag.objects.create(name="technology")
+        self.news = []
+        for i in range(3):
+            news = News.objects.create(
+                title=f"Test News {i}",
+                content=f"This is test content {i}",
+                source=f"https://example.com/news{i}"
+            )
+            news.tags.add(self.tag)
+            self.news.append(news)
+
+    def _ops(self, changes):
+        return [(change['id'], change['op']) for change in changes]
+
+    def test_changes_since_cursor(self):
+        """Test that only changes after the cursor are returned"""
+        changes, cursor, has_more = feed.changes()
+        self.assertEqual(self._ops(changes), [(news.id, feed.CREATED) for news in self.news])
+        self.assertFalse(has_more)
+
+        self.assertEqual(feed.changes(cursor)[0], [])
+
+        self.news[0].title = "Changed"
+        self.news[0].save()
+        deleted_id = self.news[1].id
+        self.news[1].delete()
+        created = News.objects.create(title="New", content="New", source="https://example.com/new")
+        changes, cursor, _ = feed.changes(cursor)
+        self.assertEqual(self._ops(changes), [
+            (self.news[0].id, feed.UPDATED),
+            (deleted_id, feed.DELETED),
+            (created.id, feed.CREATED),
+        ])
+        self.assertEqual(feed.changes(cursor)[0], [])
+
+    def test_tag_changes(self):
+        """Test that tag links, renames and deletions report the tagged news as updated"""
+        _, cursor, _ = feed.changes()
+        science = Tag.objects.create(name="science")
+        self.news[0].tags.add(science)
+        changes, cursor, _ = feed.changes(cursor)
+        self.assertEqual(self._ops(changes), [(self.news[0].id, feed.UPDATED)])
+
+        science.news_items.add(self.news[1])
+        changes, cursor, _ = feed.changes(cursor)
+        self.assertEqual(self._ops(changes), [(self.news[1].id, feed.UPDATED)])
+
+        science.name = "sciences"
+        science.save()
+        changes, cursor, _ = feed.changes(cursor)
+        self.assertEqual(self._ops(changes), [(self.news[0].id, feed.UPDATED), (self.news[1].id, feed.UPDATED)])
+
+        science.news_items.clear()
+        changes, cursor, _ = feed.changes(cursor)
+        self.assertEqual(len(changes), 2)
+
+        self.tag.delete()
+        changes, cursor, _ = feed.changes(cursor)
+        self.assertEqual(self._ops(changes), [(news.id, feed.UPDATED) for news in self.news])
+
+    def test_pages(self):
+        """Test that walking the feed page by page sees every change once"""
+        News.objects.filter(pk=self.news[2].pk).delete()
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            changes, cursor, has_more = feed.changes(cursor, limit=1)
+            seen.extend(self._ops(changes))
+        self.assertEqual(len(seen), 3)
+        self.assertIn((self.news[2].id, feed.DELETED), seen)
+        self.assertEqual(NewsTombstone.objects.get().source, self.news[2].source)
+
+    @override_settings(NEWS_CHANGES_SETTLE_SECONDS=60)
+    def test_settle(self):
+        """Test that recent changes are held back"""
+        self.assertEqual(feed.changes()[0], [])
+
+    def test_api(self):
+        """Test the change feed endpoint with payloads"""
+        url = reverse('news:news-changes')
+        response = self.client.get(url, {'payload': 1, 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['has_more'])
+        self.assertEqual(response.data['changes'][0]['news']['title'], "Test News 0")
+        self.assertEqual(response.data['changes'][0]['news']['tags_detail'][0]['name'], "technology")
+
+        deleted_id = self.news[2].id
+        self.news[2].delete()
+        response = self.client.get(url, {'cursor': response.data['cursor'], 'payload': 1})
+        self.assertEqual(self._ops(response.data['changes']), [(deleted_id, feed.DELETED)])
+        self.assertNotIn('news', response.data['changes'][0])
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.client.get(reverse('news:news-changes'), {'cursor': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,63 @@
+from django.test import TestCase
+from news.models import News, Tag
+from news.ingest import bulk_ingest
+
+
+
+class BulkIngestTest(TestCase):
+    def setUp(self):
+        self.tag = Tag.objects.create(name="technology")
+        self.news = News.objects.create(
+            title="Existing",
+            content="Existing content",
+            source="https://example.com/existing"
+        )
+
+    def _items(self, count, prefix="new"):
+        return [
+            {
+                "title": f"News {i}",
+                "content": f"Content {i}",
+                "source": f"https://example.com/{prefix}/{i}",
+                "tags": ["technology", f"{prefix}-tag-{i}", f"{prefix}-shared"],
+            }
+            for i in range(count)
+        ]
+
+    def test_results_per_item(self):
+        """Test that every item gets a created, duplicate or invalid result"""
+        items = self._items(2) + [
+            {"title": "Dup", "content": "Dup", "source": "https://example.com/existing"},
+            {"title": "Dup", "content": "Dup", "source": "https://example.com/new/0"},
+            {"title": "", "content": "No title", "source": "https://example.com/invalid"},
+        ]
+        results = bulk_ingest(items)
+
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created", "created", "duplicate", "duplicate", "invalid"]
+        )
+        self.assertIn("title", results[4]["errors"])
+        created = News.objects.get(pk=results[0]["id"])
+        self.assertEqual(
+            sorted(created.tags.values_list("name", flat=True)),
+            ["new-shared", "new-tag-0", "technology"]
+        )
+        self.assertEqual(News.objects.count(), 3)
+        self.assertEqual(Tag.objects.filter(name="technology").count(), 1)
+
+    def test_fixed_number_of_queries(self):
+        """Test that the query count does not depend on the batch size"""
+        with self.assertNumQueries(7):
+            bulk_ingest(self._items(2, prefix="small"))
+        with self.assertNumQueries(7):
+            bulk_ingest(self._items(25, prefix="large"))
+
+    def test_long_tag_fails_its_item_only(self):
+        """Test that a tag longer than Tag.name is reported on its item, the rest is saved"""
+        items = self._items(2)
+        items[1]["tags"] = ["x" * 51]
+        results = bulk_ingest(items)
+        self.assertEqual([result["status"] for result in results], ["created", "invalid"])
+        self.assertIn("tags", results[1]["errors"])
+        self.assertTrue(News.objects.filter(source="https://example.com/new/0").exists())
@@ -1,6 +1,10 @@
-from django.test import TestCase
+import time
+from unittest import mock
+from django.test import TestCase, override_settings
 from django.db import IntegrityError
 from news.models import Tag, News
+from news import models
+from news.ingest import bulk_ingest
 
 
 
@@ -18,6 +22,40 @@ class TagModelTest(TestCase):
         with self.assertRaises(IntegrityError):
             Tag.objects.create(name="Technology")
 
+    def _counts(self):
+        return dict(Tag.objects.values_list('name', 'news_count'))
+
+    def test_news_count(self):
+        """Test that news counts follow tag links, deletions and bulk ingestion"""
+        news1 = News.objects.create(title="News 1", content="Content 1", source="https://example.com/1")
+        news2 = News.objects.create(title="News 2", content="Content 2", source="https://example.com/2")
+        news1.tags.add(self.tag1, self.tag2)
+        news2.tags.add(self.tag1)
+        self.assertEqual(self._counts(), {"Technology": 2, "Science": 1})
+
+        news1.tags.remove(self.tag2)
+        self.assertEqual(self._counts(), {"Technology": 2, "Science": 0})
+        self.tag2.news_items.add(news1, news2)
+        self.assertEqual(self._counts(), {"Technology": 2, "Science": 2})
+        news2.tags.clear()
+        self.assertEqual(self._counts(), {"Technology": 1, "Science": 1})
+        news1.delete()
+        self.assertEqual(self._counts(), {"Technology": 0, "Science": 0})
+
+        bulk_ingest([
+            {"title": "Bulk", "content": "Bulk", "source": "https://example.com/bulk", "tags": ["Science"]}
+        ])
+        self.assertEqual(self._counts(), {"Technology": 0, "Science": 1})
+
+    def test_refresh_counts(self):
+        """Test that a rebuild fixes drifted counts and only writes changed rows"""
+        news = News.objects.create(title="News", content="Content", source="https://example.com/1")
+        news.tags.add(self.tag1)
+        Tag.objects.update(news_count=5)
+        self.assertEqual(Tag.refresh_counts(), 2)
+        self.assertEqual(self._counts(), {"Technology": 1, "Science": 0})
+        self.assertEqual(Tag.refresh_counts(), 0)
+
 
 class NewsModelTest(TestCase):
     def setUp(self):
@@ -59,6 +97,15 @@ class NewsModelTest(TestCase):
                 source="https://example.com/news1"  
             )
     
+    def test_existing_sources(self):
+        """Test that only already stored sources are returned"""
+        sources = News.existing_sources([
+            "https://example.com/news1",
+            "https://example.com/news3",
+        ])
+        self.assertEqual(sources, {"https://example.com/news1"})
+        self.assertEqual(News.existing_sources([]), set())
+
     def test_news_search_by_tags(self):
         """Test the search method with tags"""
         results = News.search(tags=["Technology"])
@@ -72,6 +119,36 @@ class NewsModelTest(TestCase):
         self.assertEqual(results.count(), 1)
         self.assertEqual(results.first(), self.news2)
     
+    def test_news_search_by_any_tag(self):
+        """Test the search method with the any-of tags mode"""
+        news3 = News.objects.create(
+            title="Test News 3",
+            content="This is test content 3",
+            source="https://example.com/news3"
+        )
+        news3.tags.add(self.tag2)
+
+        results = News.search(tags=["Science", "Unknown"], tags_mode="any")
+        self.assertEqual(list(results), [self.news2, news3])
+
+        results = News.search(tags=["Technology", "Unknown"])
+        self.assertEqual(results.count(), 0)
+
+    def test_news_search_by_arabic_spelling(self):
+        """Test that tag names are normalized like stored ones, so the Arabic spelling matches"""
+        self.news1.tags.add(Tag.objects.create(name="کتاب"))
+        self.assertEqual(list(News.search(tags=["كتاب"])), [self.news1])
+        self.assertEqual(list(News.search(tags=[" كتاب", "Technology"])), [self.news1])
+
+    def test_news_search_by_tags_single_query(self):
+        """Test that tag filtering needs no join or DISTINCT on news rows"""
+        query = News.search(tags=["Technology", "Science"])
+        sql = str(query.query)
+        self.assertNotIn("DISTINCT", sql)
+        self.assertIn("HAVING", sql)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(query), [self.news2])
+
     def test_news_search_by_keywords(self):
         """Test the search method with keywords"""
         results = News.search(kws=["test"])
@@ -87,6 +164,41 @@ class NewsModelTest(TestCase):
         self.assertEqual(results.count(), 1)
         self.assertEqual(results.first(), self.news2)
     
+    def test_news_search_trigram_case_rule(self):
+        """Test that trigram mode matches title and content case-insensitively"""
+        results = News.search(kws=["THIS IS"])
+        self.assertEqual(results.count(), 0)
+
+        with override_settings(NEWS_SEARCH_TRIGRAM=True), \
+                mock.patch.dict(models._trigram_ready, {'default': (True, time.monotonic())}):
+            results = News.search(kws=["THIS IS"])
+            self.assertEqual(results.count(), 2)
+            results = News.search(not_kws=["CONTENT 1"])
+            self.assertEqual(list(results), [self.news2])
+
+    def test_news_search_trigram_without_indexes(self):
+        """Test that the trigram flag is ignored where its indexes are missing"""
+        with override_settings(NEWS_SEARCH_TRIGRAM=True), \
+                mock.patch.dict(models._trigram_ready, {'default': (False, time.monotonic())}):
+            self.assertEqual(News.search(kws=["THIS IS"]).count(), 0)
+
+    def test_trigram_indexes_checked_once(self):
+        """Test that the presence of the trigram indexes is looked up once per process"""
+        with override_settings(NEWS_SEARCH_TRIGRAM=True), mock.patch.dict(models._trigram_ready, clear=True):
+            with self.assertNumQueries(1):
+                ready = models.trigram_search_enabled()
+            with self.assertNumQueries(0):
+                self.assertEqual(models.trigram_search_enabled(), ready)
+
+    def test_missing_trigram_indexes_rechecked(self):
+        """Test that missing trigram indexes are looked up again, they may have been migrated since"""
+        checked = time.monotonic() - models.TRIGRAM_RECHECK_SECONDS - 1
+        with override_settings(NEWS_SEARCH_TRIGRAM=True), \
+                mock.patch.dict(models._trigram_ready, {'default': (False, checked)}):
+            with self.assertNumQueries(1):
+                models.trigram_search_enabled()
+            self.assertGreater(models._trigram_ready['default'][1], checked)
+
     def test_news_search_combined(self):
         """Test the search method with combined parameters"""
         results = News.search(
@@ -96,3 +208,58 @@ class NewsModelTest(TestCase):
         )
         self.assertEqual(results.count(), 1)
         self.assertEqual(results.first(), self.news2)
+
+
+class NewsFullTextSearchTest(TestCase):
+    def setUp(self):
+        self.tag = Tag.objects.create(name="Technology")
+        self.news1 = News.objects.create(
+            title="Apple event",
+            content="Apple announced a new phone at the event",
+            source="https://example.com/news1"
+        )
+        self.news1.tags.add(self.tag)
+        self.news2 = News.objects.create(
+            title="Phone review",
+            content="A review of the new Apple phone, the camera is great",
+            source="https://example.com/news2"
+        )
+        self.news3 = News.objects.create(
+            title="گوشي جديد",
+            content="اين گوشي با دوربين بهتر عرضه شد",
+            source="https://example.com/news3"
+        )
+
+    def test_search_vector_is_maintained(self):
+        """Test that the search vector follows title and content changes"""
+        results = News.search(kws=["camera"], engine="fulltext")
+        self.assertEqual(list(results), [self.news2])
+
+        self.news1.content = "The camera was not mentioned"
+        self.news1.save()
+        results = News.search(kws=["camera"], engine="fulltext")
+        self.assertEqual(set(results), {self.news1, self.news2})
+
+    def test_fulltext_keywords(self):
+        """Test that keywords are OR-ed phrases and excluded keywords are removed"""
+        results = News.search(kws=["announced", "camera"], engine="fulltext")
+        self.assertEqual(set(results), {self.news1, self.news2})
+
+        results = News.search(kws=["new phone"], engine="fulltext")
+        self.assertEqual(list(results), [self.news1])
+
+        results = News.search(kws=["apple"], not_kws=["review"], engine="fulltext")
+        self.assertEqual(list(results), [self.news1])
+
+        results = News.search(tags=["Technology"], kws=["apple"], engine="fulltext")
+        self.assertEqual(list(results), [self.news1])
+
+    def test_fulltext_persian(self):
+        """Test that Arabic and Persian forms of the same letters match"""
+        results = News.search(kws=["گوشی"], engine="fulltext")
+        self.assertEqual(list(results), [self.news3])
+
+    def test_fulltext_relevance(self):
+        """Test ordering by relevance"""
+        results = News.search(kws=["phone"], engine="fulltext", relevance=True)
+        self.assertEqual(list(results), [self.news2, self.news1])
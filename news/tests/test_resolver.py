@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.test import TestCase
+from news.models import Tag
+from news.resolver import TagResolver
+from news.serializers import NewsSerializer
+
+
+class TagResolverTest(TestCase):
+    def setUp(self):
+        self.resolver = TagResolver()
+        self.tag = Tag.objects.create(name="technology")
+
+    def resolve(self, names, resolver=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return (resolver or self.resolver).resolve(names)
+
+    def test_normalization(self):
+        """Test that spellings of the same name resolve to one tag"""
+        ids = self.resolve(["  علي ", "علی", "caf\u00e9", "cafe\u0301", ""])
+        self.assertEqual(set(ids), {"علی", "caf\u00e9"})
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertTrue(Tag.objects.filter(name="علی").exists())
+
+    def test_only_misses_reach_the_database(self):
+        """Test that known names are served from the LRU, then from the shared map"""
+        with self.assertNumQueries(1):
+            ids = self.resolve(["technology", "science"])
+        self.assertEqual(ids["technology"], self.tag.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve(["science", "technology"]), ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve(["science"], resolver=TagResolver()), {"science": ids["science"]})
+        with self.assertNumQueries(1):
+            self.resolve(["science", "physics"])
+
+    def test_deleted_tags(self):
+        """Test that deleting a tag drops its cached id"""
+        self.resolve(["technology"])
+        self.tag.delete()
+        ids = self.resolve(["technology"])
+        self.assertNotEqual(ids["technology"], self.tag.id)
+        self.assertTrue(Tag.objects.filter(pk=ids["technology"]).exists())
+
+    def test_rolled_back_tags(self):
+        """Test that ids of tags created by a rolled back transaction are not cached"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    rolled_back = self.resolver.resolve(["science"])
+                    raise ValueError
+            except ValueError:
+                pass
+        ids = self.resolve(["science"])
+        self.assertTrue(Tag.objects.filter(pk=ids["science"]).exists())
+        self.assertNotEqual(ids, rolled_back)
+
+    def test_serializer(self):
+        """Test that news tags are normalized and deduplicated"""
+        serializer = NewsSerializer(data={
+            "title": "News",
+            "content": "Content",
+            "source": "https://example.com/news",
+            "tags": ["كتاب", "کتاب ", "technology"],
+        })
+        self.assertTrue(serializer.is_valid())
+        news = serializer.save()
+        self.assertEqual(sorted(news.tags.values_list("name", flat=True)), ["technology", "کتاب"])
+        self.assertEqual(Tag.objects.get(name="کتاب").news_count, 1)
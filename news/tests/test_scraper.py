@@ -0,0 +1,185 @@
+import json
+import time
+from pathlib import Path
+from django.test import SimpleTestCase, TestCase, override_settings
+from concurrent.futures import ThreadPoolExecutor
+from news.models import News
+from news.scraper import (
+    HostThrottle, ZoomitScraper, ARTICLE_READY, EXTRACT_ARTICLE_SCRIPT, host_resolver_rules, page_traffic
+)
+from news.driverpool import DriverPool
+from news.sinks import NullSink
+from news.parsers import parse_article, parse_archive_links
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+
+class HostThrottleTest(SimpleTestCase):
+    def test_same_host_is_spaced(self):
+        """Test that requests to one host respect the minimum interval across workers"""
+        throttle = HostThrottle(min_interval=0.05, jitter=0)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(throttle.wait, ["https://www.zoomit.ir/a/"] * 4))
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+    def test_other_hosts_are_not_delayed(self):
+        """Test that different hosts have independent budgets"""
+        throttle = HostThrottle(min_interval=1, jitter=0)
+        started = time.monotonic()
+        throttle.wait("https://www.zoomit.ir/")
+        throttle.wait("https://example.com/")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class ParserTest(SimpleTestCase):
+    def setUp(self):
+        with open(FIXTURES / "zoomit_article.html", encoding="utf-8") as f:
+            self.article_html = f.read()
+        with open(FIXTURES / "zoomit_archive.html", encoding="utf-8") as f:
+            self.archive_html = f.read()
+
+    def test_parse_article(self):
+        """Test extracting title, tags and content from an article page"""
+        data = parse_article(self.article_html, "https://www.zoomit.ir/mobile/1001/")
+        self.assertEqual(data["title"], "آیفون جدید معرفی شد")
+        self.assertEqual(data["tags"], ["اپل", "موبایل"])
+        self.assertEqual(data["content"], "پاراگراف اول خبر\nپاراگراف دوم خبر")
+        self.assertEqual(data["source"], "https://www.zoomit.ir/mobile/1001/")
+
+    def test_parse_article_falls_back_to_fourth_block(self):
+        """Test that older pages keep their content in the fourth block"""
+        html = self.article_html.replace("<p>", "<span>").replace("</p>", "</span>")
+        html = html.replace("<div><span>متن خبر قدیمی</span></div>", "<div><p>متن خبر قدیمی</p></div>")
+        data = parse_article(html, "https://www.zoomit.ir/mobile/1001/")
+        self.assertEqual(data["content"], "متن خبر قدیمی")
+
+    def test_parse_article_without_title(self):
+        """Test that a page rendered by JavaScript yields an empty title"""
+        data = parse_article("<html><body><div id='root'></div></body></html>", "https://www.zoomit.ir/x/")
+        self.assertEqual(data["title"], "")
+        self.assertEqual(parse_article("", "https://www.zoomit.ir/x/")["title"], "")
+
+    def test_parse_archive_links(self):
+        """Test that archive links are absolute, unique and exclude advertisements"""
+        urls = parse_archive_links(self.archive_html, "https://www.zoomit.ir/archive/")
+        self.assertEqual(urls, [
+            "https://www.zoomit.ir/mobile/1001-first-news/",
+            "https://www.zoomit.ir/tech/1002-second-news/",
+        ])
+
+
+class IncrementalScrapeTest(TestCase):
+    def setUp(self):
+        self.scraper = ZoomitScraper(sink=NullSink(), backend="http", max_pages=5)
+        self.archive = {
+            "https://www.zoomit.ir/archive/": ["https://www.zoomit.ir/a/", "https://www.zoomit.ir/b/"],
+            "https://www.zoomit.ir/archive/?pageNumber=2": ["https://www.zoomit.ir/c/", "https://www.zoomit.ir/d/"],
+            "https://www.zoomit.ir/archive/?pageNumber=3": ["https://www.zoomit.ir/e/"],
+        }
+        self.scraper._collect_links = lambda url: self.archive.get(url, [])
+        News.objects.create(title="Known", content="Known", source="https://www.zoomit.ir/d/")
+
+    def test_known_sources_are_skipped(self):
+        """Test that known links are skipped and pagination stops at them"""
+        urls, skipped = self.scraper.discover_new_urls("https://www.zoomit.ir/archive/")
+        self.assertEqual(urls, [
+            "https://www.zoomit.ir/a/",
+            "https://www.zoomit.ir/b/",
+            "https://www.zoomit.ir/c/",
+        ])
+        self.assertEqual(skipped, 1)
+
+    def test_pagination_stops_at_empty_page(self):
+        """Test that pagination stops when the archive runs out of links"""
+        News.objects.all().delete()
+        urls, skipped = self.scraper.discover_new_urls("https://www.zoomit.ir/archive/")
+        self.assertEqual(len(urls), 5)
+        self.assertEqual(skipped, 0)
+
+
+def _log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeBrowser:
+    def __init__(self, entries=()):
+        self.entries = list(entries)
+        self.loaded = []
+        self.calls = []
+
+    def get(self, url):
+        self.loaded.append(url)
+
+    def find_elements(self, by, selector):
+        return [selector]
+
+    def get_log(self, kind):
+        entries, self.entries = self.entries, []
+        return entries
+
+    def find_element(self, by, selector):
+        self.calls.append(("find_element", selector))
+        return selector
+
+    def execute_script(self, script):
+        self.calls.append(("execute_script", script))
+        return {"title": "Title", "tags": ["mobile", "apple"], "paragraphs": ["First", "Second"]}
+
+    def quit(self):
+        pass
+
+
+class BrowserTrafficTest(SimpleTestCase):
+    def setUp(self):
+        self.entries = [
+            _log_entry("Network.loadingFinished", requestId="1", encodedDataLength=3072),
+            _log_entry("Network.loadingFinished", requestId="2", encodedDataLength=1024),
+            _log_entry("Network.loadingFailed", requestId="3", blockedReason="inspector"),
+            _log_entry("Network.loadingFailed", requestId="4", errorText="net::ERR_NAME_NOT_RESOLVED"),
+            _log_entry("Network.loadingFailed", requestId="5", errorText="net::ERR_TIMED_OUT"),
+            _log_entry("Network.requestWillBeSent", requestId="6"),
+        ]
+
+    def test_page_traffic(self):
+        """Test that received bytes and blocked requests are read from the network log"""
+        self.assertEqual(page_traffic(self.entries), (4096, 2))
+
+    def test_host_resolver_rules(self):
+        """Test that every host but the allowed ones fails to resolve"""
+        self.assertEqual(
+            host_resolver_rules(["zoomit.ir", "*.zoomit.ir"]),
+            "MAP * ~NOTFOUND, EXCLUDE zoomit.ir, EXCLUDE *.zoomit.ir",
+        )
+
+    @override_settings(ZOOMIT_SELENIUM_BLOCK_RESOURCES=True)
+    def test_run_report(self):
+        """Test that the page time and traffic of Chrome pages are reported"""
+        browser = FakeBrowser(self.entries)
+        pool = DriverPool(lambda: browser, size=1)
+        scraper = ZoomitScraper(sink=NullSink(), backend="selenium", host_interval=0, driver_pool=pool)
+        with scraper._browser():
+            scraper._get_page("https://www.zoomit.ir/a/", ARTICLE_READY)
+        report = scraper.browser_report()
+        self.assertEqual(browser.loaded, ["https://www.zoomit.ir/a/"])
+        self.assertTrue(report["resource_blocking"])
+        self.assertEqual(report["pages"], 1)
+        self.assertEqual(report["kb_received"], 4.0)
+        self.assertEqual(report["blocked_requests"], 2)
+
+    def test_extraction_in_one_call(self):
+        """Test that an article is read with one script call, whatever its size"""
+        browser = FakeBrowser()
+        scraper = ZoomitScraper(sink=NullSink(), backend="selenium", host_interval=0,
+                                driver_pool=DriverPool(lambda: browser, size=1))
+        with scraper._browser():
+            data = scraper._extract_article_data("https://www.zoomit.ir/a/")
+        self.assertEqual(data, {
+            "title": "Title",
+            "content": "First\nSecond",
+            "tags": ["mobile", "apple"],
+            "source": "https://www.zoomit.ir/a/",
+        })
+        self.assertEqual(browser.calls, [("find_element", "h1"), ("execute_script", EXTRACT_ARTICLE_SCRIPT)])
@@ -1,6 +1,9 @@
-from django.test import TestCase
+from datetime import datetime, timezone as dt_timezone
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
 from news.models import News, Tag
-from news.serializers import NewsSerializer, TagSerializer
+from news.renderers import ORJSONRenderer
+from news.serializers import NewsSerializer, TagSerializer, LEAN_NEWS_FIELDS, lean_news_data
 
 
 
@@ -30,6 +33,14 @@ class TagSerializerTest(TestCase):
         tag = serializer.save()
         self.assertEqual(tag.name, "technology")
     
+    def test_tag_serializer_folded_duplicate(self):
+        """Test that a name only colliding once normalized is reported as a duplicate"""
+        Tag.objects.create(name="کتاب")
+        serializer = TagSerializer(data={"name": "كتاب"})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('name', serializer.errors)
+        self.assertEqual(serializer.errors['name'][0].code, 'unique')
+
     def test_tag_serializer_update(self):
         """Test updating a tag with the serializer"""
         serializer = TagSerializer(self.tag, data={"name": "physics"})
@@ -95,3 +106,65 @@ class NewsSerializerTest(TestCase):
         
         # Check that tags were updated
         self.assertIn(self.tag2, updated_news.tags.all())
+
+
+class LeanNewsSerializerTest(TestCase):
+    def setUp(self):
+        tags = [Tag.objects.create(name=name) for name in ("zebra", "Apple", "گوشی", "apple")]
+        contents = ["Plain content", "محتوای فارسی\nبا خط جدید", "Quotes \" and \\ and \u2028 separators", ""]
+        for i, content in enumerate(contents):
+            news = News.objects.create(
+                title=f"News {i} <b>&</b>",
+                content=content,
+                source=f"https://example.com/news/{i}?q=ü"
+            )
+            news.tags.add(*tags[:i])
+        # Whole seconds and UTC offsets are formatted differently
+        News.objects.filter(source="https://example.com/news/0?q=ü").update(
+            created=datetime(2025, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+        )
+
+    def _outputs(self):
+        query = News.objects.order_by('id')
+        expected = NewsSerializer(query.prefetch_related('tags'), many=True).data
+        return expected, lean_news_data(query.values(*LEAN_NEWS_FIELDS))
+
+    def test_same_json(self):
+        """Test that the lean serializer renders byte-identical JSON to NewsSerializer"""
+        expected, lean = self._outputs()
+        self.assertEqual(JSONRenderer().render(lean), JSONRenderer().render(expected))
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_same_json_in_utc(self):
+        """Test datetime formatting when the current time zone is UTC"""
+        expected, lean = self._outputs()
+        self.assertEqual(JSONRenderer().render(lean), JSONRenderer().render(expected))
+        self.assertTrue(lean[0]['created'].endswith('Z'))
+
+    def test_single_tags_query(self):
+        """Test that tags are fetched with one query whatever the number of rows"""
+        rows = list(News.objects.values(*LEAN_NEWS_FIELDS))
+        with self.assertNumQueries(1):
+            lean_news_data(rows)
+
+    def test_orjson_renderer(self):
+        """Test that the orjson renderer produces the bytes of JSONRenderer"""
+        expected, lean = self._outputs()
+        payload = {"count": 4, "next": None, "results": lean}
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+        self.assertEqual(
+            ORJSONRenderer().render(payload, 'application/json; indent=4'),
+            JSONRenderer().render(payload, 'application/json; indent=4'),
+        )
+
+    def test_orjson_renderer_datetimes(self):
+        """Test that raw dates and times are rendered like JSONRenderer does"""
+        moment = datetime(2024, 5, 1, 8, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        payload = {
+            "ts": moment,
+            "whole": moment.replace(microsecond=0),
+            "naive": moment.replace(tzinfo=None),
+            "day": moment.date(),
+            "time": moment.time(),
+        }
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
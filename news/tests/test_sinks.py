@@ -0,0 +1,66 @@
+import hashlib
+import os
+import tempfile
+from django.test import SimpleTestCase
+from concurrent.futures import ThreadPoolExecutor
+from news.sinks import JsonlSink, iter_records
+
+
+
+class JsonlSinkTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "news_output.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_read(self):
+        """Test that records are appended and streamed back in order"""
+        with JsonlSink(self.path) as sink:
+            sink.write({"title": "خبر اول"})
+            sink.write({"title": "خبر دوم"})
+        with JsonlSink(self.path) as sink:
+            sink.write({"title": "خبر سوم"})
+
+        titles = [record["title"] for record in iter_records(self.path)]
+        self.assertEqual(titles, ["خبر اول", "خبر دوم", "خبر سوم"])
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_gzip(self):
+        """Test that a compressed dump can be appended to and read back"""
+        for i in range(2):
+            with JsonlSink(self.path, compress=True) as sink:
+                sink.write({"id": i})
+        self.assertTrue(os.path.exists(f"{self.path}.gz"))
+        self.assertEqual([r["id"] for r in iter_records(f"{self.path}.gz")], [0, 1])
+
+    def test_rotation(self):
+        """Test that the dump is rotated by size and all parts are read"""
+        with JsonlSink(self.path, rotate_bytes=30) as sink:
+            for i in range(10):
+                sink.write({"id": i, "title": "x" * 10})
+        self.assertGreater(len(os.listdir(self.tmp.name)), 1)
+        self.assertEqual([r["id"] for r in iter_records(self.path)], list(range(10)))
+
+    def test_gzip_rotation(self):
+        """Test that a compressed dump is rotated by its compressed size, across reopens"""
+        path = f"{self.path}.gz"
+        for part in range(2):
+            with JsonlSink(path, rotate_bytes=4096) as sink:
+                for i in range(1000):
+                    record_id = part * 1000 + i
+                    sink.write({"id": record_id, "content": hashlib.sha256(str(record_id).encode()).hexdigest()})
+        rotated = [name for name in os.listdir(self.tmp.name) if name != os.path.basename(path)]
+        self.assertTrue(rotated)
+        for name in rotated:
+            self.assertGreaterEqual(os.path.getsize(os.path.join(self.tmp.name, name)), 4096)
+        self.assertEqual([r["id"] for r in iter_records(path)], list(range(2000)))
+
+    def test_concurrent_writes(self):
+        """Test that concurrent workers never interleave records"""
+        with JsonlSink(self.path) as sink:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda i: sink.write({"id": i, "content": "y" * 500}), range(200)))
+        self.assertEqual(sorted(r["id"] for r in iter_records(self.path)), list(range(200)))
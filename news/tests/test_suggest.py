@@ -0,0 +1,71 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from news.models import News, Tag
+from news.ingest import bulk_ingest
+from news import suggest
+
+
+class TagSuggestTest(TestCase):
+    def setUp(self):
+        suggest.index = suggest.TagIndex()
+        self.client = APIClient()
+        for name in ("Apple", "Android", "application", "Samsung", "گوشی", "کیبورد"):
+            Tag.objects.create(name=name)
+
+    def _names(self, query, **params):
+        response = self.client.get(reverse('news:tag-suggest'), {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tag['name'] for tag in response.data]
+
+    def test_prefix(self):
+        """Test case-insensitive prefix suggestions"""
+        self.assertEqual(self._names("ap"), ["Apple", "application"])
+        self.assertEqual(self._names("A", limit=2), ["Android", "Apple"])
+        self.assertEqual(self._names("گو"), ["گوشی"])
+        self.assertEqual(self._names("x"), [])
+        self.assertEqual(self._names(" "), [])
+
+    def test_persian_spelling(self):
+        """Test that Arabic and Persian spellings of a letter match each other"""
+        self.assertEqual(self._names("كي"), ["کیبورد"])
+
+    def test_served_from_memory(self):
+        """Test that a warm index answers without any query"""
+        self._names("ap")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._names("sam"), ["Samsung"])
+
+    def test_rebuilt_on_new_tags(self):
+        """Test that created, bulk created and deleted tags outdate the index"""
+        self._names("ap")
+        Tag.objects.create(name="Apricot")
+        self.assertEqual(self._names("apr"), ["Apricot"])
+        bulk_ingest([
+            {"title": "News", "content": "Content", "source": "https://example.com/1", "tags": ["Apex"]}
+        ])
+        self.assertEqual(self._names("ape"), ["Apex"])
+        Tag.objects.filter(name="Apex").delete()
+        self.assertEqual(self._names("ape"), [])
+
+    def test_news_counts_keep_index(self):
+        """Test that tagging news does not rebuild the index"""
+        self._names("ap")
+        version = suggest.index.version
+        news = News.objects.create(title="News", content="Content", source="https://example.com/1")
+        news.tags.add(Tag.objects.get(name="Apple"))
+        self._names("ap")
+        self.assertEqual(suggest.index.version, version)
+
+    def test_database_fallback(self):
+        """Test the database lookup used while the index is cold"""
+        self.assertEqual(
+            [tag['name'] for tag in suggest.search_database("ap", 10)], ["Apple", "application"]
+        )
+        self.assertEqual([tag['name'] for tag in suggest.search_database("كي", 10)], ["کیبورد"])
+
+    def test_database_fallback_arabic_spelling(self):
+        """Test that a Persian query finds a tag stored with Arabic letters"""
+        Tag.objects.filter(name="کیبورد").update(name="كيبورد")
+        self.assertEqual([tag['name'] for tag in suggest.search_database("کی", 10)], ["كيبورد"])
@@ -0,0 +1,201 @@
+import os
+import time
+from unittest import mock
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.celery import celery_app
+from news.models import News, Tag
+from news.scraper import ZoomitScraper
+from news.runlock import RunLock, scrape_lock, SKIP
+from news import tasks
+
+
+ARTICLES = {
+    "https://www.zoomit.ir/a/": {"title": "A", "content": "Content A", "tags": ["mobile"]},
+    "https://www.zoomit.ir/b/": {"title": "B", "content": "Content B", "tags": ["mobile", "apple"]},
+    "https://www.zoomit.ir/c/": {"title": "", "content": "", "tags": []},
+}
+
+
+@override_settings(ZOOMIT_SCRAPER_OUTPUT='none', ZOOMIT_FETCH_RETRIES=2)
+class FanOutScrapeTest(TestCase):
+    def setUp(self):
+        # The app reads its configuration under the CELERY namespace
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, 'CELERY_TASK_ALWAYS_EAGER', False)
+        tasks._scrapers.clear()
+        self.calls = {}
+        patcher = mock.patch.object(ZoomitScraper, 'discover_new_urls', lambda scraper, url: (list(ARTICLES), 1))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(ZoomitScraper, 'scrape_article', self._scrape_article)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _scrape_article(self, url):
+        self.calls[url] = self.calls.get(url, 0) + 1
+        return {**ARTICLES[url], "source": url}
+
+    def test_fan_out(self):
+        """Test that discovered articles are fetched one task each and persisted"""
+        result = tasks.discover_zoomit.delay(backend="http")
+        self.assertEqual(result.get(), {"new": 3, "skipped": 1})
+        self.assertEqual(sorted(News.objects.values_list("title", flat=True)), ["A", "B"])
+        self.assertEqual(Tag.objects.get(name="mobile").news_count, 2)
+        self.assertEqual(self.calls, {url: 1 for url in ARTICLES})
+
+    def test_retries(self):
+        """Test that failing pages are retried, then reported without failing the run"""
+        flaky = {"https://www.zoomit.ir/a/": 1, "https://www.zoomit.ir/b/": 5}
+
+        def scrape_article(scraper, url):
+            self.calls[url] = self.calls.get(url, 0) + 1
+            if self.calls[url] <= flaky.get(url, 0):
+                raise requests.ConnectionError("boom")
+            return {**ARTICLES[url], "source": url}
+
+        with mock.patch.object(ZoomitScraper, 'scrape_article', scrape_article):
+            tasks.discover_zoomit.delay(backend="http")
+        self.assertEqual(list(News.objects.values_list("title", flat=True)), ["A"])
+        self.assertEqual(self.calls["https://www.zoomit.ir/a/"], 2)
+        self.assertEqual(self.calls["https://www.zoomit.ir/b/"], 3)
+
+    def test_persist_in_batches(self):
+        """Test the persistence step on its own"""
+        articles = [{**ARTICLES[url], "source": url} for url in ARTICLES]
+        articles.append({"source": "https://www.zoomit.ir/d/", "error": "boom"})
+        with override_settings(ZOOMIT_SCRAPER_BATCH_SIZE=1):
+            stats = tasks.persist_articles(articles)
+        self.assertEqual(stats, {"pages": 4, "saved": 2, "failed": 1})
+
+    def test_fetch_rate_follows_host_interval(self):
+        """Test that fanned out fetches keep the per-host budget by default"""
+        if os.environ.get('ZOOMIT_FETCH_RATE_LIMIT'):
+            self.skipTest("Rate limit configured explicitly")
+        self.assertEqual(
+            tasks.fetch_article.rate_limit, f"{60 / settings.ZOOMIT_SCRAPER_HOST_INTERVAL:g}/m"
+        )
+
+    @override_settings(ZOOMIT_SCRAPER_FANOUT=True)
+    def test_scrape_zoomit_dispatches(self):
+        """Test that the scheduled task hands over to the discovery task"""
+        with mock.patch.object(tasks.discover_zoomit, 'delay') as delay:
+            tasks.scrape_zoomit()
+        delay.assert_called_once_with(backend=None, max_pages=None, output=None, lock=mock.ANY)
+        self.assertTrue(scrape_lock.status()['running'])
+
+    @override_settings(ZOOMIT_SCRAPER_FANOUT=True)
+    def test_lock_released_by_last_step(self):
+        """Test that a fanned out run holds the scrape lock until its articles are saved"""
+        tasks.scrape_zoomit.delay(backend="http")
+        state = scrape_lock.status()
+        self.assertFalse(state['running'])
+        self.assertEqual(state['last_result'], {"pages": 3, "saved": 2, "failed": 0})
+
+
+@override_settings(ZOOMIT_SCRAPER_OUTPUT='none')
+class ScrapeLockTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.stats = {"new": 1, "saved": 1}
+        patcher = mock.patch.object(ZoomitScraper, 'scrape_archive', lambda scraper: self.stats)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_flight(self):
+        """Test that the lock is held by one run at a time"""
+        token = scrape_lock.acquire()
+        self.assertIsNotNone(token)
+        self.assertIsNone(scrape_lock.acquire())
+        self.assertTrue(scrape_lock.renew(token))
+        self.assertFalse(scrape_lock.renew("other"))
+        scrape_lock.release(token)
+        self.assertIsNotNone(scrape_lock.acquire())
+
+    def test_stale_lock_expires(self):
+        """Test that a lock whose holder stopped renewing is taken over"""
+        lock = RunLock("stale", lease=1)
+        self.assertIsNotNone(lock.acquire())
+        time.sleep(1.1)
+        self.assertIsNotNone(lock.acquire())
+
+    def test_expired_holder_cannot_touch_new_lock(self):
+        """Test that a holder whose lease expired neither renews nor releases its successor's lock"""
+        lock = RunLock("taken", lease=1)
+        token = lock.acquire()
+        time.sleep(1.1)
+        successor = lock.acquire()
+        self.assertIsNotNone(successor)
+        self.assertFalse(lock.renew(token))
+        lock.release(token)
+        self.assertTrue(lock.status()['running'])
+        self.assertTrue(lock.renew(successor))
+
+    def test_heartbeat_renews(self):
+        """Test that the heartbeat keeps a long run's lock past its lease"""
+        lock = RunLock("long", lease=1, heartbeat=0.2)
+        token = lock.acquire()
+        with lock.heartbeat(token):
+            time.sleep(1.5)
+            self.assertIsNone(lock.acquire())
+        self.assertIn('heartbeat', lock.status())
+
+    def test_run_status(self):
+        """Test that a run records its duration and result"""
+        self.assertEqual(tasks.scrape_zoomit(), self.stats)
+        state = scrape_lock.status()
+        self.assertFalse(state['running'])
+        self.assertEqual(state['last_result'], self.stats)
+        self.assertIsNone(state['last_error'])
+        self.assertGreaterEqual(state['last_duration'], 0)
+
+    @override_settings(ZOOMIT_SCRAPE_OVERLAP=SKIP)
+    def test_overlap_skipped(self):
+        """Test that a trigger during a run is dropped"""
+        token = scrape_lock.acquire()
+        self.assertEqual(tasks.scrape_zoomit(), {"overlap": SKIP})
+        self.assertFalse(scrape_lock.status()['pending'])
+        self.assertFalse(scrape_lock.release(token))
+        self.assertEqual(scrape_lock.status()['skipped'], 1)
+
+    def test_overlap_coalesced(self):
+        """Test that triggers during a run start a single run once it finishes"""
+        def scrape_archive(scraper):
+            tasks.scrape_zoomit()
+            tasks.scrape_zoomit()
+            return self.stats
+
+        with mock.patch.object(ZoomitScraper, 'scrape_archive', scrape_archive), \
+                mock.patch.object(tasks.scrape_zoomit, 'delay') as delay:
+            tasks.scrape_zoomit()
+        delay.assert_called_once_with()
+        self.assertFalse(scrape_lock.status()['pending'])
+
+    def test_failed_run_releases(self):
+        """Test that a failing run releases the lock and records the error"""
+        with mock.patch.object(ZoomitScraper, 'scrape_archive', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                tasks.scrape_zoomit()
+        state = scrape_lock.status()
+        self.assertFalse(state['running'])
+        self.assertEqual(state['last_error'], "boom")
+
+    def test_status_endpoint(self):
+        """Test that the run state is exposed to admins only"""
+        url = reverse('news:scrape-status')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        admin = get_user_model().objects.create_user(
+            "09120000000", "admin@example.com", "Admin", "User", "password", is_admin=True
+        )
+        self.client.force_authenticate(admin)
+        tasks.scrape_zoomit()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['running'])
+        self.assertEqual(response.data['last_result'], self.stats)
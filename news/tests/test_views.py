@@ -3,6 +3,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from news.models import News, Tag
+from django.contrib.auth import get_user_model
 import json
 
 
@@ -39,6 +40,29 @@ class NewsAPITest(TestCase):
         self.assertIn('count', response.data)
         self.assertEqual(response.data['count'], 2)
 
+    def test_news_list_query_count(self):
+        """Test that listing news costs a fixed number of queries whatever the page size"""
+        for i in range(3, 30):
+            news = News.objects.create(
+                title=f"Test News {i}",
+                content=f"This is test content {i}",
+                source=f"https://example.com/news{i}"
+            )
+            news.tags.add(self.tag1, self.tag2)
+
+        for page_size in (2, 25):
+            # validators, count, page and tags
+            with self.assertNumQueries(4):
+                response = self.client.get(f"{reverse('news:news-list')}?page_size={page_size}")
+            self.assertEqual(len(response.data['results']), page_size)
+            self.assertEqual(
+                [tag['name'] for tag in response.data['results'][1]['tags_detail']],
+                ['science', 'technology']
+            )
+            # validators, page and tags
+            with self.assertNumQueries(3):
+                self.client.get(f"{reverse('news:news-list')}?pagination=cursor&page_size={page_size}")
+
     def test_get_news_detail(self):
         """Test retrieving a specific news item"""
         response = self.client.get(reverse('news:news-detail', args=[self.news1.id]))
@@ -68,6 +92,32 @@ class NewsAPITest(TestCase):
         self.assertEqual(new_news.tags.count(), 2)
         self.assertTrue(Tag.objects.filter(name="politics").exists())
     
+    def test_bulk_create_news(self):
+        """Test creating many news items with one request"""
+        admin = get_user_model().objects.create_user(
+            "09120000000", "admin@example.com", "Admin", "User", "password", is_admin=True
+        )
+        self.client.force_authenticate(admin)
+        data = [
+            {"title": "Bulk 1", "content": "Bulk", "source": "https://example.com/bulk1", "tags": ["technology"]},
+            {"title": "Bulk 2", "content": "Bulk", "source": "https://example.com/news1"},
+            {"title": "", "content": "Bulk", "source": "https://example.com/bulk3"},
+        ]
+
+        response = self.client.post(
+            reverse('news:news-list'),
+            data=json.dumps(data),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'duplicate', 'invalid']
+        )
+        self.assertEqual(News.objects.count(), 3)
+
     def test_update_news(self):
         """Test updating a news item"""
         data = {
@@ -119,6 +169,45 @@ class NewsAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 1)
 
+    def test_cursor_pagination(self):
+        """Test walking the news list forwards and backwards with cursors"""
+        news3 = News.objects.create(
+            title="Test News 3",
+            content="This is test content 3",
+            source="https://example.com/news3"
+        )
+        url = f"{reverse('news:news-list')}?pagination=cursor&page_size=2"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual([n['id'] for n in response.data['results']], [self.news1.id, self.news2.id])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([n['id'] for n in response.data['results']], [news3.id])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([n['id'] for n in response.data['results']], [self.news1.id, self.news2.id])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(f"{url}&tags=technology&with_count=exact")
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get(f"{url}&with_count=estimate")
+        self.assertIsInstance(response.data['count'], int)
+
+        response = self.client.get(f"{reverse('news:news-list')}?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_fulltext_search_news(self):
+        """Test searching news items through the full-text engine"""
+        response = self.client.get(
+            f"{reverse('news:news-list')}?engine=fulltext&kws=content 1&ordering=relevance"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.news1.id)
+
 
 class TagAPITest(TestCase):
     def setUp(self):
@@ -142,6 +231,49 @@ class TagAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 2)
     
+    def test_get_tags_with_cursor(self):
+        """Test that tags are paginated by name with cursors"""
+        response = self.client.get(f"{reverse('news:tag-list')}?pagination=cursor&page_size=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'science')
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['name'], 'technology')
+        self.assertIsNone(response.data['next'])
+
+    def test_get_tags_by_popularity(self):
+        """Test ordering tags by news count, with pages and cursors"""
+        other = News.objects.create(title="Other", content="Other", source="https://example.com/other")
+        other.tags.add(self.tag2)
+        response = self.client.get(f"{reverse('news:tag-list')}?ordering=-news_count")
+        self.assertEqual(
+            [(tag['name'], tag['news_count']) for tag in response.data['results']],
+            [('science', 2), ('technology', 1)]
+        )
+
+        response = self.client.get(f"{reverse('news:tag-list')}?ordering=-news_count&pagination=cursor&page_size=1")
+        self.assertEqual(response.data['results'][0]['name'], 'science')
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['name'], 'technology')
+        self.assertIsNone(response.data['next'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(response.data['results'][0]['name'], 'science')
+
+    def test_popular_tags(self):
+        """Test the popular tags endpoint"""
+        unused = Tag.objects.create(name="unused")
+        other = News.objects.create(title="Other", content="Other", source="https://example.com/other")
+        other.tags.add(self.tag1)
+        response = self.client.get(f"{reverse('news:tag-popular')}?limit=5")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in response.data], ['technology', 'science'])
+        self.assertNotIn(unused.name, [tag['name'] for tag in response.data])
+        self.assertEqual(response.data[0]['news_count'], 2)
+
+        # News payloads keep their nested tags unchanged
+        response = self.client.get(reverse('news:news-detail', args=[self.news.id]))
+        self.assertEqual(set(response.data['tags_detail'][0]), {'id', 'name'})
+
     def test_get_tag_detail(self):
         """Test retrieving a specific tag"""
         response = self.client.get(reverse('news:tag-detail', args=[self.tag1.id]))
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 
 app_name = 'news'
@@ -7,8 +7,22 @@ urlpatterns = [
     # News endpoints
     path('news/', views.NewsAPI.as_view(), name='news-list'),
     path('news/<int:pk>/', views.NewsAPI.as_view(), name='news-detail'),
+    path('news/export/', views.NewsExportAPI.as_view(), name='news-export'),
+    path('news/changes/', views.NewsChangesAPI.as_view(), name='news-changes'),
     
+    # Async read path, for ASGI servers
+    path('async/news/', async_views.news_list, name='async-news-list'),
+    path('async/news/<int:pk>/', async_views.news_detail, name='async-news-detail'),
+
     # Tag endpoints
     path('tags/', views.TagAPI.as_view(), name='tag-list'),
     path('tags/<int:pk>/', views.TagAPI.as_view(), name='tag-detail'),
+    path('tags/popular/', views.PopularTagsAPI.as_view(), name='tag-popular'),
+    path('tags/suggest/', views.TagSuggestAPI.as_view(), name='tag-suggest'),
+
+    # Scraper endpoints
+    path('scrape/status/', views.ScrapeStatusAPI.as_view(), name='scrape-status'),
+
+    # Cache endpoints
+    path('cache/stats/', views.CacheStatsAPI.as_view(), name='cache-stats'),
 ]
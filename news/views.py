@@ -1,50 +1,114 @@
 from rest_framework import views, status, permissions
 from rest_framework.response import Response
 from rest_framework.request import Request
-from .serializers import NewsSerializer, TagSerializer
-from .models import News, Tag
+from .serializers import NewsSerializer, TagSerializer, TagCountSerializer, LEAN_NEWS_FIELDS, lean_news_data
+from .models import News, Tag, SEARCH_ENGINES, TAG_MODES
 from django.shortcuts import get_object_or_404
-from .pagination import PaginationMixin, CustomPagination
+from django.http import StreamingHttpResponse
+from .pagination import PaginationMixin, CustomPagination, KeysetPagination
+from .ingest import bulk_ingest, CREATED
+from . import cache, export, feed, suggest
+from .conditional import make_etag
+from .runlock import scrape_lock
+from django.db.models import Count, Max
+from django.conf import settings
 from utils import IsAdminOrReadOnly
 
 
 
+def search_news(params):
+    """News items matching the `tags`, `kws`, `not_kws`, `engine`, `ordering` and `tags_mode` params"""
+    tags = params.getlist('tags', '')
+    kws = params.getlist('kws', '')
+    not_kws = params.getlist('not_kws', '')
+    engine = params.get('engine')
+    if engine not in SEARCH_ENGINES:
+        engine = None
+    relevance = params.get('ordering') == 'relevance'
+    tags_mode = params.get('tags_mode')
+    if tags_mode not in TAG_MODES:
+        tags_mode = 'all'
+    return News.search(
+        tags, kws, not_kws, engine=engine, relevance=relevance, tags_mode=tags_mode
+    )
+
+
 class NewsAPI(PaginationMixin, views.APIView):
     """
     API view to list, retrieve, update or delete a specific news item based on tags,
     keywords, and excluded keywords.
+    `engine=fulltext` searches through the full-text index and
+    `ordering=relevance` ranks its results, `tags_mode=any` matches
+    items having any of the given tags instead of all of them.
     """
 
     pagination_class = CustomPagination
+    cursor_pagination_class = KeysetPagination
+    keyset_ordering = ('created', 'id')
+    cache_scope = cache.NEWS
     permission_classes = [IsAdminOrReadOnly]
 
     def get_object(self, pk: int):
         return get_object_or_404(News, pk=pk)
 
+    def get_queryset(self, request: Request):
+        """News items matching the filters of the request"""
+        return search_news(request.query_params)
+
+    def get_validators(self, request: Request, pk=None):
+        """
+        ETag of a GET response, computed from max(updated) and the count of
+        the requested items, plus the tag change counter since payloads embed
+        tag names.
+        No Last-Modified: deletions, tag renames and tag links do not change
+        max(updated), an If-Modified-Since request would get a stale 304.
+        """
+        if pk:
+            query = News.objects.filter(pk=pk)
+        else:
+            query = self.get_queryset(request).order_by()
+        state = query.aggregate(updated=Max('updated'), count=Count('id'))
+        if pk and not state['count']:
+            return None, None
+        etag = make_etag(
+            request.path,
+            cache.normalized_params(request),
+            state['updated'],
+            state['count'],
+            cache.generation_token(cache.TAGS),
+        )
+        return etag, None
+
     def get(self, request: Request, pk=None, *args, **kwargs):
+        return cache.cached_response(
+            self.cache_scope, request,
+            lambda: self.build_response(request, pk),
+            validators=lambda: self.get_validators(request, pk),
+        )
+
+    def build_response(self, request: Request, pk=None):
+        """Uncached GET response"""
         if pk:
             # Retrieve a specific news item
-            news = get_object_or_404(News, pk=pk)
+            news = get_object_or_404(News.objects.prefetch_related('tags'), pk=pk)
             serializer = NewsSerializer(news)
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
-            # List news items with optional filtering
-            tags = request.query_params.getlist('tags', '')
-            kws = request.query_params.getlist('kws', '')
-            not_kws = request.query_params.getlist('not_kws', '')
-            query = News.search(tags, kws, not_kws)
+            # List news items with optional filtering, read as plain rows
+            # for the lean serializer
+            query = self.get_queryset(request).values(*LEAN_NEWS_FIELDS)
 
             # Apply pagination
             page = self.paginate_queryset(query)
             if page is not None:
-                serializer = NewsSerializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
+                return self.get_paginated_response(lean_news_data(page))
 
-            serializer = NewsSerializer(query, many=True)
-            return Response(data=serializer.data, status=status.HTTP_200_OK)
+            return Response(data=lean_news_data(query), status=status.HTTP_200_OK)
 
     def post(self, request: Request, *args, **kwargs):
-        """Create a new news item"""
+        """Create a new news item, or many at once when a list is posted"""
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
         serializer = NewsSerializer(data=request.data)
         if serializer.is_valid():
             try:
@@ -60,6 +124,23 @@ class NewsAPI(PaginationMixin, views.APIView):
                 )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def bulk_create(self, request: Request):
+        """
+        Create many news items with a fixed number of queries.
+        Responds with one result per item: created, duplicate or invalid.
+        """
+        if len(request.data) > settings.NEWS_BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"At most {settings.NEWS_BULK_MAX_ITEMS} items can be created at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = bulk_ingest(request.data)
+        created = sum(1 for result in results if result['status'] == CREATED)
+        return Response(
+            {"created": created, "results": results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
     def put(self, request: Request, pk: int, *args, **kwargs):
         """partially Update a specific tag
         ,deleted patch method and combined these to methods"""
@@ -86,30 +167,61 @@ class NewsAPI(PaginationMixin, views.APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def tag_validators(request: Request):
+    """ETag of a tag GET response, computed from the tag change counter"""
+    token = cache.generation_token(cache.TAGS)
+    if token is None:
+        return None, None
+    return make_etag(request.path, cache.normalized_params(request), token), None
+
+
 class TagAPI(PaginationMixin, views.APIView):
     """
     API view to list, retrieve, update or delete tag items.
+    Lists are ordered by name, or by popularity with `ordering=-news_count`.
     """
     permission_classes = [IsAdminOrReadOnly]
     pagination_class = CustomPagination
+    cursor_pagination_class = KeysetPagination
+    # Keyset ordering of every accepted `ordering` param, the first is the default
+    orderings = {
+        'name': ('name', 'id'),
+        '-news_count': ('-news_count', 'name'),
+    }
+    keyset_ordering = orderings['name']
+    cache_scope = cache.TAGS
+
+    def get_validators(self, request: Request, pk=None):
+        return tag_validators(request)
 
     def get(self, request: Request, pk=None, *args, **kwargs):
+        return cache.cached_response(
+            self.cache_scope, request,
+            lambda: self.build_response(request, pk),
+            validators=lambda: self.get_validators(request, pk),
+        )
+
+    def build_response(self, request: Request, pk=None):
+        """Uncached GET response"""
         if pk:
             # Retrieve a specific tag
             tag = get_object_or_404(Tag, pk=pk)
-            serializer = TagSerializer(tag)
+            serializer = TagCountSerializer(tag)
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
             # List tags
-            tags = Tag.objects.all()
+            self.keyset_ordering = self.orderings.get(
+                request.query_params.get('ordering'), self.keyset_ordering
+            )
+            tags = Tag.objects.order_by(*self.keyset_ordering)
 
             # Apply pagination
             page = self.paginate_queryset(tags)
             if page is not None:
-                serializer = TagSerializer(page, many=True)
+                serializer = TagCountSerializer(page, many=True)
                 return self.get_paginated_response(serializer.data)
 
-            serializer = TagSerializer(tags, many=True)
+            serializer = TagCountSerializer(tags, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request: Request, *args, **kwargs):
@@ -153,3 +265,144 @@ class TagAPI(PaginationMixin, views.APIView):
         tag = get_object_or_404(Tag, pk=pk)
         tag.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PopularTagsAPI(views.APIView):
+    """
+    API view listing the most used tags with their news count, served from
+    the response cache. `limit` sets their number (NEWS_POPULAR_TAGS by default).
+    """
+    permission_classes = [IsAdminOrReadOnly]
+    cache_scope = cache.TAGS
+
+    def get(self, request: Request, *args, **kwargs):
+        return cache.cached_response(
+            self.cache_scope, request,
+            lambda: self.build_response(request),
+            validators=lambda: tag_validators(request),
+        )
+
+    def build_response(self, request: Request):
+        """Uncached GET response"""
+        try:
+            limit = int(request.query_params.get('limit', settings.NEWS_POPULAR_TAGS))
+        except ValueError:
+            limit = settings.NEWS_POPULAR_TAGS
+        limit = max(1, min(limit, settings.NEWS_POPULAR_TAGS_MAX))
+        tags = Tag.objects.filter(news_count__gt=0).order_by('-news_count', 'name')[:limit]
+        serializer = TagCountSerializer(tags, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class TagSuggestAPI(views.APIView):
+    """
+    API view suggesting tags whose name starts with `q`, case-insensitively
+    and whatever the Persian/Arabic spelling, from an in-process index.
+    `limit` sets the number of suggestions (NEWS_TAG_SUGGEST_LIMIT by default).
+    """
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get(self, request: Request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limit', settings.NEWS_TAG_SUGGEST_LIMIT))
+        except ValueError:
+            limit = settings.NEWS_TAG_SUGGEST_LIMIT
+        limit = max(1, min(limit, settings.NEWS_TAG_SUGGEST_MAX))
+        tags = suggest.index.suggest(request.query_params.get('q', ''), limit)
+        return Response(tags, status=status.HTTP_200_OK)
+
+
+class NewsExportAPI(views.APIView):
+    """
+    API view streaming the whole news archive, or the part matching the
+    `tags`, `kws`, `not_kws` and `updated_since` filters, as NDJSON or CSV
+    (`fmt=ndjson|csv`). Rows are read from a server-side cursor and
+    written as they come, without pagination or serializers, so memory
+    stays flat whatever the archive size.
+    """
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get(self, request: Request, *args, **kwargs):
+        fmt = request.query_params.get('fmt', 'ndjson')
+        if fmt not in export.FORMATS:
+            return Response(
+                {"error": f"fmt must be one of: {', '.join(export.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        updated_since = request.query_params.get('updated_since')
+        if updated_since:
+            try:
+                updated_since = export.parse_since(updated_since)
+            except ValueError:
+                return Response(
+                    {"error": "updated_since must be an ISO 8601 date or datetime"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        tags_mode = request.query_params.get('tags_mode')
+        query = export.export_queryset(
+            tags=request.query_params.getlist('tags'),
+            kws=request.query_params.getlist('kws'),
+            not_kws=request.query_params.getlist('not_kws'),
+            updated_since=updated_since or None,
+            tags_mode=tags_mode if tags_mode in TAG_MODES else 'all',
+        )
+        response = StreamingHttpResponse(
+            export.render(export.iter_rows(query), fmt),
+            content_type=export.CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="news.{fmt}"'
+        return response
+
+
+class NewsChangesAPI(views.APIView):
+    """
+    Change feed of the news table, for clients mirroring it.
+    Returns the ids of news items created, updated or deleted since
+    `cursor`, oldest first, with the cursor of the next call.
+    `limit` bounds the page (at most NEWS_CHANGES_MAX_LIMIT) and
+    `payload=1` embeds the current state of created and updated items.
+    """
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get(self, request: Request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            limit = 100
+        limit = max(1, min(limit, settings.NEWS_CHANGES_MAX_LIMIT))
+        try:
+            changes, cursor, has_more = feed.changes(request.query_params.get('cursor'), limit)
+        except feed.InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('payload') in ('1', 'true'):
+            ids = [change['id'] for change in changes if change['op'] != feed.DELETED]
+            news = News.objects.defer('search_vector').prefetch_related('tags').in_bulk(ids)
+            for change in changes:
+                if change['id'] in news and change['op'] != feed.DELETED:
+                    change['news'] = NewsSerializer(news[change['id']]).data
+        return Response(
+            {"changes": changes, "cursor": cursor, "has_more": has_more},
+            status=status.HTTP_200_OK
+        )
+
+
+class ScrapeStatusAPI(views.APIView):
+    """
+    API view exposing the state of the scheduled scrape: whether a run holds
+    the lock, and the duration and result of the last run, admins only.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request, *args, **kwargs):
+        return Response(scrape_lock.status(), status=status.HTTP_200_OK)
+
+
+class CacheStatsAPI(views.APIView):
+    """
+    API view exposing the hit/miss counters of the response cache, admins only.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request, *args, **kwargs):
+        return Response(cache.stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,18 @@
+#!/bin/sh
+# Start the web server selected by WEB_SERVER:
+# - runserver (default): Django development server
+# - gunicorn: multi-worker WSGI server, settings in gunicorn.conf.py
+# - uvicorn: gunicorn managing uvicorn workers, serves the ASGI app and its async views
+set -e
+
+case "${WEB_SERVER:-runserver}" in
+    gunicorn)
+        exec gunicorn core.wsgi:application --config gunicorn.conf.py --worker-class "${WEB_WORKER_CLASS:-gthread}"
+        ;;
+    uvicorn)
+        exec gunicorn core.asgi:application --config gunicorn.conf.py --worker-class uvicorn_worker.UvicornWorker
+        ;;
+    *)
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+esac